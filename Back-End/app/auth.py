@@ -1,9 +1,12 @@
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config import settings
+from app.executors import password_executor, ExecutorBusyError
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -11,6 +14,38 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+def verify_and_update_password(plain_password, hashed_password) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password. If it matches but the stored hash uses outdated settings
+    (e.g. BCRYPT_ROUNDS changed), also return a fresh hash to store.
+    """
+    if not pwd_context.verify(plain_password, hashed_password):
+        return False, None
+    if pwd_context.needs_update(hashed_password):
+        return True, pwd_context.hash(plain_password)
+    return True, None
+
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many password checks in progress, please retry shortly",
+        headers={"Retry-After": "1"}
+    )
+
+async def authenticate_password(plain_password, hashed_password) -> Tuple[bool, Optional[str]]:
+    """verify_and_update_password on the password executor (503 when it is saturated)"""
+    try:
+        return await password_executor.run(verify_and_update_password, plain_password, hashed_password)
+    except ExecutorBusyError:
+        raise _busy()
+
+def hash_password(password) -> str:
+    """get_password_hash on the password executor, for request handlers (503 when it is saturated)"""
+    try:
+        return password_executor.call(get_password_hash, password)
+    except ExecutorBusyError:
+        raise _busy()
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
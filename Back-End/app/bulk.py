@@ -0,0 +1,49 @@
+"""
+Shared body parsing for the bulk endpoints (account registration, case filing)
+
+A bulk body is a JSON array, or a JSON object holding the array under one key
+(e.g. {"accounts": [...]}). Every item is validated on its own, so a bad row
+becomes a per-row error instead of failing the whole request.
+"""
+import json
+from typing import Any, List, Optional, Tuple, Type
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+
+
+def load_json_items(body: bytes, key: str) -> list:
+    """The items of a JSON array body, or of the array under `key` in a JSON object body"""
+    try:
+        payload = json.loads(body or b"null")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+    raw_items = payload.get(key) if isinstance(payload, dict) else payload
+    if not isinstance(raw_items, list):
+        raise HTTPException(status_code=400, detail=f"Expected a JSON array of {key}")
+    return raw_items
+
+
+def format_validation_error(error: ValidationError) -> str:
+    """One line per failed field: 'loc: message; loc: message'"""
+    return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in error.errors())
+
+
+def validate_items(raw_items: List[Any], schema: Type[BaseModel], max_items: int,
+                   noun: str) -> List[Tuple[Optional[BaseModel], Optional[str]]]:
+    """
+    Validate raw items into (item, error) pairs, one per submitted item.
+    An Exception in raw_items (e.g. an unparsable NDJSON line) becomes that row's error.
+    """
+    if len(raw_items) > max_items:
+        raise HTTPException(status_code=413, detail=f"At most {max_items} {noun} per request")
+
+    parsed = []
+    for raw in raw_items:
+        if isinstance(raw, Exception):
+            parsed.append((None, str(raw)))
+            continue
+        try:
+            parsed.append((schema.model_validate(raw), None))
+        except ValidationError as e:
+            parsed.append((None, format_validation_error(e)))
+    return parsed
@@ -0,0 +1,95 @@
+"""
+In-process TTL cache for read-heavy endpoints (dashboards, analytics)
+
+Each cache declares which models its values are computed from. Whenever a
+session commits changes to one of those models, the cache is cleared, so the
+TTL only bounds staleness caused by writes from other worker processes.
+"""
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class TTLCache:
+    """Thread-safe key/value cache whose entries expire after ttl_seconds"""
+
+    def __init__(self, ttl_seconds: float, depends_on: Iterable[type]):
+        self.ttl_seconds = ttl_seconds
+        self.depends_on = tuple(depends_on)
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        # Bumped on every invalidation so values computed from pre-write data are not stored
+        self._generation = 0
+        self._lock = threading.Lock()
+        _caches.append(self)
+
+    def _lookup(self, key: Hashable, now: float) -> Tuple[bool, Any, int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return True, entry[1], self._generation
+            return False, None, self._generation
+
+    def _store(self, key: Hashable, value: Any, now: float, generation: int):
+        if self.ttl_seconds > 0:
+            with self._lock:
+                if generation == self._generation:
+                    self._entries[key] = (now + self.ttl_seconds, value)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        hit, value, generation = self._lookup(key, now)
+        if hit:
+            return value
+        value = compute()
+        self._store(key, value, now, generation)
+        return value
+
+    async def get_or_compute_async(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Same as get_or_compute for a coroutine function (async endpoints)"""
+        now = time.monotonic()
+        hit, value, generation = self._lookup(key, now)
+        if hit:
+            return value
+        value = await compute()
+        self._store(key, value, now, generation)
+        return value
+
+    def invalidate(self, key: Hashable = None):
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+_caches: List[TTLCache] = []
+
+
+def invalidate_for(models: Iterable[type]):
+    """Clear every cache computed from any of the given models"""
+    models = tuple(models)
+    for cache in _caches:
+        if any(issubclass(model, cache.depends_on) for model in models):
+            cache.invalidate()
+
+
+@event.listens_for(Session, "after_flush")
+def _record_changed_models(session, flush_context):
+    changed = session.info.setdefault("changed_models", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        changed.add(type(obj))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    changed = session.info.pop("changed_models", None)
+    if changed:
+        invalidate_for(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session):
+    session.info.pop("changed_models", None)
@@ -5,6 +5,42 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    
+    # Database connection pool (recycle below MySQL's wait_timeout)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    
+    # Password hashing (existing hashes are upgraded to BCRYPT_ROUNDS on next login)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_PROCESSES: bool = False  # process pool instead of threads
+    PASSWORD_HASH_MAX_PENDING: int = 64  # queued + running; beyond this requests get 503
+    
+    # Background case scheduling (file_case returns before the P-MLQ search runs)
+    BACKGROUND_SCHEDULING: bool = True
+    SCHEDULING_QUEUE_SIZE: int = 1000
+    SCHEDULING_BATCH_SIZE: int = 100
+    SCHEDULING_CLAIM_TIMEOUT_SECONDS: int = 600  # claims not refreshed for this long (crashed worker) are taken over
+    
+    # Pick the judge who can hear a new case soonest (least workload breaks ties) instead of
+    # the least-loaded judge first; needs numpy, otherwise least-loaded assignment is kept
+    CROSS_JUDGE_SEARCH: bool = False
+    
+    # Document uploads
+    MAX_UPLOAD_SIZE_MB: int = 500
+    
+    # Threads for blocking work started from async endpoints (disk writes, inline scheduling)
+    BLOCKING_WORKERS: int = 8
+    
+    # Request timing (Server-Timing header; slower or chattier requests are logged)
+    SLOW_REQUEST_MS: int = 1000
+    SLOW_REQUEST_QUERIES: int = 50
+    
+    # Dashboard analytics cache (cleared on writes; 0 disables caching)
+    ANALYTICS_CACHE_TTL_SECONDS: int = 30
 
     class Config:
         env_file = ".env"
@@ -1,15 +1,131 @@
+import threading
+import time
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+# Checkouts that wait longer than this are logged as a sign of pool pressure
+SLOW_CHECKOUT_SECONDS = 1.0
+
+class PoolStats:
+    """Counters for connection checkouts, including time spent waiting for a free connection"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            if timed_out:
+                self.timeouts += 1
+
+pool_stats = PoolStats()
+
+class CheckoutTimingMixin:
+    """Records how long each checkout waited for a free connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_stats.record(time.perf_counter() - start, timed_out=True)
+            print(f"Database pool exhausted: no connection within {settings.DB_POOL_TIMEOUT}s")
+            raise
+        wait = time.perf_counter() - start
+        pool_stats.record(wait)
+        if wait > SLOW_CHECKOUT_SECONDS:
+            print(f"Warning: waited {wait:.2f}s for a database connection")
+        return connection
+
+class InstrumentedQueuePool(CheckoutTimingMixin, QueuePool):
+    """QueuePool that records checkout wait times"""
+
+class InstrumentedAsyncQueuePool(CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    """Async-adapted QueuePool that records checkout wait times"""
+
+# Async drivers used in place of the configured sync ones
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "mysql": "aiomysql",
+}
+
+def async_database_url(database_url: str):
+    """DATABASE_URL with its driver swapped for the async equivalent (e.g. mysql+pymysql -> mysql+aiomysql)"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+def engine_options(pool_class=InstrumentedQueuePool) -> dict:
+    """Pool configuration from settings (SQLite keeps SQLAlchemy's default sizes)"""
+    url = make_url(settings.DATABASE_URL)
+    if url.get_backend_name() == "sqlite":
+        # In-memory databases use a single shared connection, not a QueuePool
+        if url.database in (None, "", ":memory:"):
+            return {}
+        return {"poolclass": pool_class}
+    return {
+        "poolclass": pool_class,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+engine = create_engine(settings.DATABASE_URL, **engine_options())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Async engine for endpoints that run on the event loop (same database, own pool)
+async_engine = create_async_engine(async_database_url(settings.DATABASE_URL),
+                                   **engine_options(InstrumentedAsyncQueuePool))
+# Objects stay usable after commit; async sessions cannot lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+def _pool_usage(pool) -> dict:
+    usage = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        usage.update({
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+        })
+    return usage
+
+def get_pool_status() -> dict:
+    """Current pool usage (sync and async engines) plus cumulative checkout statistics"""
+    status = _pool_usage(engine.pool)
+    status["async"] = _pool_usage(async_engine.pool)
+    status.update({
+        "checkouts": pool_stats.checkouts,
+        "timeouts": pool_stats.timeouts,
+        "avg_wait_ms": round(pool_stats.total_wait / pool_stats.checkouts * 1000, 3) if pool_stats.checkouts else 0.0,
+        "max_wait_ms": round(pool_stats.max_wait * 1000, 3),
+    })
+    return status
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,104 @@
+"""
+Bounded executors for blocking work started from async endpoints
+
+Async endpoints must never block the event loop: disk writes, hashing and the
+synchronous P-MLQ scheduler run here instead. The pool is fixed-size, so a
+burst of filings queues up behind BLOCKING_WORKERS threads rather than
+competing with every other request for the default threadpool.
+
+Password hashing gets its own executor with admission control: bcrypt is
+deliberately slow, so a login storm is capped at PASSWORD_HASH_WORKERS
+concurrent hashes plus a short queue, and anything beyond that is refused
+instead of starving the rest of the API.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+from app.config import settings
+
+blocking_executor = ThreadPoolExecutor(
+    max_workers=settings.BLOCKING_WORKERS,
+    thread_name_prefix="blocking"
+)
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run func(*args, **kwargs) on the blocking executor and await the result"""
+    loop = asyncio.get_running_loop()
+    # Carry context variables (request-scoped state) into the worker thread
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(blocking_executor, call)
+
+
+class ExecutorBusyError(Exception):
+    """Raised when a bounded executor already has its maximum of pending calls"""
+    pass
+
+
+class BoundedExecutor:
+    """Executor wrapper that caps queued plus running calls (admission control)"""
+
+    def __init__(self, executor: Executor, max_pending: int):
+        self.executor = executor
+        self.max_pending = max_pending
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _release(self, _future: Future = None):
+        with self._lock:
+            self._pending -= 1
+
+    def submit(self, func: Callable[..., Any], *args) -> Future:
+        """Queue func(*args), or raise ExecutorBusyError if max_pending calls are outstanding"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise ExecutorBusyError(f"{self._pending} calls already pending")
+            self._pending += 1
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Released when the work finishes, even if the caller stopped waiting
+        future.add_done_callback(self._release)
+        return future
+
+    def submit_when_free(self, func: Callable[..., Any], *args, retry_seconds: float = 0.05) -> Future:
+        """
+        submit(), waiting for a free place instead of raising ExecutorBusyError.
+        For batch work that must not exceed the cap but should not be refused either.
+        """
+        while True:
+            try:
+                return self.submit(func, *args)
+            except ExecutorBusyError:
+                time.sleep(retry_seconds)
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def call(self, func: Callable[..., Any], *args) -> Any:
+        """Blocking variant for sync endpoints"""
+        return self.submit(func, *args).result()
+
+
+def _password_executor() -> BoundedExecutor:
+    if settings.PASSWORD_HASH_PROCESSES:
+        executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+    else:
+        # bcrypt releases the GIL, so threads already hash in parallel
+        executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS,
+                                      thread_name_prefix="password")
+    return BoundedExecutor(executor, settings.PASSWORD_HASH_MAX_PENDING)
+
+
+password_executor = _password_executor()
@@ -0,0 +1,256 @@
+"""
+In-process metrics registry with Prometheus text-format output
+
+Counters, gauges and histograms are kept in memory per worker process and
+rendered by GET /metrics in the Prometheus exposition format (version 0.0.4),
+so any Prometheus-compatible scraper can collect them without extra packages.
+Gauges can be backed by a function that is called at scrape time.
+"""
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from sqlalchemy import func
+from app.database import SessionLocal, get_pool_status
+from app.executors import password_executor
+from app.models import Case, CaseStatus
+
+LabelValues = Tuple[str, ...]
+
+# Request latency buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def lines(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.type_name}"] + self.lines()
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+    type_name = "counter"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        super().__init__(name, description, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def lines(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(v)}" for key, v in items]
+
+
+class Gauge(Metric):
+    """
+    Value that goes up and down. Either set directly, or backed by a function
+    called at scrape time that returns a number (unlabelled gauge) or a
+    {label values tuple: number} dict.
+    """
+    type_name = "gauge"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = (),
+                 function: Optional[Callable[[], Union[float, Dict[LabelValues, float]]]] = None):
+        super().__init__(name, description, labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._function = function
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Callable[[], Union[float, Dict[LabelValues, float]]]):
+        self._function = function
+
+    def lines(self) -> List[str]:
+        if self._function is not None:
+            try:
+                result = self._function()
+            except Exception as e:
+                print(f"Metrics: could not collect {self.name}: {e}")
+                return []
+            items = sorted(result.items()) if isinstance(result, dict) else [((), result)]
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(v)}" for key, v in items]
+
+
+class Histogram(Metric):
+    """Cumulative bucket counts plus sum and count of observed values"""
+    type_name = "histogram"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[len(self.buckets)] += 1
+            state[-1] += value
+
+    def lines(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        lines = []
+        for key, state in items:
+            for i, bound in enumerate(self.buckets):
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, ('le', _format_value(bound)))} {state[i]}")
+            total = state[len(self.buckets)]
+            lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, ('le', '+Inf'))} {total}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {total}")
+        return lines
+
+
+class FunctionCounter(Gauge):
+    """Counter whose value is read from a function at scrape time (e.g. totals kept elsewhere)"""
+    type_name = "counter"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# API
+HTTP_REQUESTS = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status code", ("method", "route", "status")))
+HTTP_REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")))
+HTTP_REQUEST_SQL_STATEMENTS = registry.register(Histogram(
+    "http_request_sql_statements", "SQL statements issued per request", ("method", "route"),
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500)))
+
+# Filing and scheduling (queue = P-MLQ level: Q1 simple, Q2 moderate, Q3 complex/highly complex)
+CASES_FILED = registry.register(Counter(
+    "cases_filed_total", "Cases filed, by complexity", ("complexity",)))
+SCHEDULER_CASES = registry.register(Counter(
+    "scheduler_cases_total", "schedule_case outcomes by queue level", ("queue", "outcome")))
+SCHEDULER_HEARINGS = registry.register(Counter(
+    "scheduler_hearings_total", "schedule_next_hearing outcomes by queue level", ("queue", "outcome")))
+SCHEDULER_SLOT_SEARCH = registry.register(Histogram(
+    "scheduler_slot_search_seconds", "Time to find and reserve a slot, by queue level", ("queue",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)))
+SCHEDULER_DAYS_SCANNED = registry.register(Histogram(
+    "scheduler_days_scanned", "Weekdays searched per scheduling call, by queue level", ("queue",),
+    buckets=(1, 2, 5, 10, 20, 40, 65)))
+SCHEDULER_QUERIES = registry.register(Histogram(
+    "scheduler_queries_per_call", "SQL statements issued per scheduling call, by queue level", ("queue",),
+    buckets=(1, 2, 5, 10, 20, 50)))
+SCHEDULER_WORK = registry.register(Counter(
+    "scheduler_work_total",
+    "Scheduler work units (weekend_days_skipped, slots_generated, schedule_rows_compared, conflict_checks)",
+    ("queue", "kind")))
+SCHEDULER_PHASE_SECONDS = registry.register(Counter(
+    "scheduler_phase_seconds_total",
+    "Time spent generating free slots vs checking for consecutive slots", ("queue", "phase")))
+SCHEDULING_BACKLOG = registry.register(Gauge(
+    "scheduling_queue_backlog", "Filed cases waiting for the background scheduler"))
+
+
+def _pending_cases() -> float:
+    db = SessionLocal()
+    try:
+        return db.query(func.count(Case.id)).filter(Case.status == CaseStatus.PENDING).scalar()
+    finally:
+        db.close()
+
+
+CASES_PENDING = registry.register(Gauge(
+    "cases_pending", "Cases filed but not scheduled yet (database count)", function=_pending_cases))
+
+
+# Database connection pools
+def _pool_gauge(field: str) -> Callable[[], Dict[LabelValues, float]]:
+    def collect():
+        status = get_pool_status()
+        values = {}
+        for engine_name, usage in (("sync", status), ("async", status["async"])):
+            if field in usage:
+                values[(engine_name,)] = usage[field]
+        return values
+    return collect
+
+
+for _field, _description in (
+    ("pool_size", "Configured connections kept open"),
+    ("checked_out", "Connections currently in use"),
+    ("checked_in", "Idle connections in the pool"),
+    ("overflow", "Connections open beyond pool_size"),
+):
+    registry.register(Gauge(f"db_pool_{_field}", _description, ("engine",), function=_pool_gauge(_field)))
+
+registry.register(FunctionCounter(
+    "db_pool_checkouts_total", "Connection checkouts (both engines)",
+    function=lambda: get_pool_status()["checkouts"]))
+registry.register(FunctionCounter(
+    "db_pool_timeouts_total", "Checkouts that timed out waiting for a connection",
+    function=lambda: get_pool_status()["timeouts"]))
+registry.register(Gauge(
+    "db_pool_max_wait_seconds", "Longest wait for a connection since start",
+    function=lambda: get_pool_status()["max_wait_ms"] / 1000))
+
+# Password hashing executor
+registry.register(Gauge(
+    "password_hash_pending", "Password hashes queued or running (requests beyond the cap get 503)",
+    function=lambda: password_executor.pending))
@@ -0,0 +1,203 @@
+"""
+Per-request timing and SQL statement counting
+
+Every request gets a RequestStats object in a context variable. SQLAlchemy
+engine events (sync and async engines) add each statement's count and time
+to it, including statements run from worker threads, since the context is
+carried into run_in_threadpool and run_blocking. The totals are sent back in
+a Server-Timing header (visible in the browser's network panel), recorded in
+the per-route metrics, and requests that are slow or issue too many
+statements are logged.
+
+UploadSizeLimitMiddleware enforces MAX_UPLOAD_SIZE_MB while the request body
+is being received, before FastAPI spools it to a temporary file.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+from sqlalchemy import event
+from app.config import settings
+from app.database import engine, async_engine
+from app.metrics import HTTP_REQUESTS, HTTP_REQUEST_DURATION, HTTP_REQUEST_SQL_STATEMENTS
+
+
+class RequestStats:
+    """Wall time, DB time and statement count for one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record_query(self, seconds: float):
+        with self._lock:
+            self.queries += 1
+            self.db_seconds += seconds
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record_query(time.perf_counter() - started)
+
+
+for _engine in (engine, async_engine.sync_engine):
+    event.listen(_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def server_timing(stats: RequestStats) -> str:
+    app_seconds = max(0.0, stats.elapsed - stats.db_seconds)
+    return (
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries", '
+        f"app;dur={app_seconds * 1000:.1f}, "
+        f"total;dur={stats.elapsed * 1000:.1f}"
+    )
+
+
+_route_paths: Dict[Callable, str] = {}
+
+
+def route_template(scope) -> str:
+    """
+    Path template of the route that handled the request (e.g. /api/cases/{case_id}),
+    so metrics get one series per route rather than per URL
+    """
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is None or app is None:
+        return "unmatched"
+    if endpoint not in _route_paths:
+        for route in app.router.routes:
+            if getattr(route, "endpoint", None) is endpoint:
+                _route_paths[endpoint] = route.path
+                break
+        else:
+            return "unmatched"
+    return _route_paths[endpoint]
+
+
+class RequestTimingMiddleware:
+    """
+    ASGI middleware that adds Server-Timing to every HTTP response and logs
+    requests slower than SLOW_REQUEST_MS or issuing more than SLOW_REQUEST_QUERIES statements.
+    Pure ASGI (not BaseHTTPMiddleware) so streaming responses are not buffered.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Covers everything up to the first byte; streamed bodies are logged below
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(stats).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            elapsed = stats.elapsed
+            route = route_template(scope)
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=status_code)
+            HTTP_REQUEST_DURATION.observe(elapsed, method=scope["method"], route=route)
+            HTTP_REQUEST_SQL_STATEMENTS.observe(stats.queries, method=scope["method"], route=route)
+            elapsed_ms = elapsed * 1000
+            if elapsed_ms > settings.SLOW_REQUEST_MS or stats.queries > settings.SLOW_REQUEST_QUERIES:
+                print(
+                    f"Slow request: {scope['method']} {scope['path']} -> {status_code} "
+                    f"in {elapsed_ms:.0f} ms ({stats.queries} queries, {stats.db_seconds * 1000:.0f} ms in DB)"
+                )
+
+
+# Room for the form fields sent alongside a document of the maximum size
+FORM_FIELDS_ALLOWANCE = 1024 * 1024
+
+
+def max_request_body_bytes() -> int:
+    return settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024 + FORM_FIELDS_ALLOWANCE
+
+
+class UploadSizeLimitMiddleware:
+    """
+    ASGI middleware that answers 413 as soon as a request body is known to be too large:
+    up front from Content-Length, or, for chunked bodies, once the bytes received pass
+    the limit. The rest of the body is never read, so oversized uploads are not spooled.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def _reject(self, send):
+        body = b'{"detail":"Request body exceeds ' + str(settings.MAX_UPLOAD_SIZE_MB).encode() + b' MB upload limit"}'
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        max_bytes = max_request_body_bytes()
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_bytes:
+            await self._reject(send)
+            return
+
+        received = 0
+        rejected = False
+
+        async def receive_limited():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # Answer now; the endpoint sees a disconnected client and its response is dropped
+                    rejected = True
+                    await self._reject(send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def send_unless_rejected(message):
+            if not rejected:
+                await send(message)
+
+        await self.app(scope, receive_limited, send_unless_rejected)
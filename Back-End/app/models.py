@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Enum, ForeignKey, Date, Time, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, Enum, ForeignKey, Date, Time, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -110,7 +110,19 @@ class JudgeSchedule(Base):
     
     judge = relationship("Judge", back_populates="schedules")
     
-    class Config:
-        indexes = [
-            {"fields": ["judge_id", "date"], "unique": False}
-        ]
+    # Slot search reads a judge's whole search window with one range query
+    __table_args__ = (
+        Index("idx_judge_date", "judge_id", "date"),
+    )
+
+class SchedulingClaim(Base):
+    """
+    A worker process's claim on a PENDING case it is about to schedule.
+    The primary key makes claiming atomic across processes; the row is deleted
+    once the scheduling attempt is over, so it also means "queued" to every worker.
+    """
+    __tablename__ = "scheduling_claims"
+    
+    case_id = Column(Integer, ForeignKey("cases.id", ondelete="CASCADE"), primary_key=True)
+    owner = Column(String(100), nullable=False, index=True)
+    claimed_at = Column(DateTime, nullable=False)
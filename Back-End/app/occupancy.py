@@ -0,0 +1,278 @@
+"""
+In-memory occupancy index for judge calendars
+
+Each judge-day is stored as an integer bitmap over the 30-minute slot grid of
+the workday (bit i set = slot i overlaps an existing JudgeSchedule row).
+A judge's bookings are loaded with a single (judge_id, date) range query over
+the search window and then kept up to date as the scheduler books new slots,
+so slot search becomes a memory lookup. Bookings made by other worker
+processes are picked up when a judge's window is reloaded: after a booking
+conflict, and at the latest every refresh_seconds.
+
+Runs of free slots are found with shift/AND operations on the bitmap (see
+first_free_run) instead of comparing slot times pairwise.
+"""
+import threading
+import time as clock
+from datetime import date, time, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, not_
+from app.models import JudgeSchedule
+
+
+def first_free_run(free: int, length: int) -> Optional[int]:
+    """
+    Index of the lowest slot starting `length` consecutive set bits in `free`, or None.
+    Bit i of the result survives only if bits i..i+length-1 are all set; doubling the
+    shift keeps it to O(log length) operations.
+    """
+    run = free
+    covered = 1
+    while covered < length and run:
+        shift = min(covered, length - covered)
+        run &= run >> shift
+        covered += shift
+    if not run:
+        return None
+    return (run & -run).bit_length() - 1
+
+
+class JudgeOccupancyIndex:
+    """Per-judge, per-day slot bitmaps shared by all scheduler instances"""
+
+    def __init__(self, work_start_hour: int, work_end_hour: int, slot_duration: int,
+                 refresh_seconds: int = 60):
+        self.day_start = work_start_hour * 60
+        self.day_end = work_end_hour * 60
+        self.slot_duration = slot_duration
+        self.num_slots = (self.day_end - self.day_start) // slot_duration
+        self.refresh_seconds = refresh_seconds
+
+        self._days: Dict[int, Dict[date, int]] = {}
+        # Date range [start, end) already loaded from the database, per judge, and when
+        self._loaded: Dict[int, Tuple[date, date]] = {}
+        self._loaded_at: Dict[int, float] = {}
+        # Slots reserved by this process but not committed yet, so reloads keep them
+        self._pending: Dict[int, Dict[date, int]] = {}
+        # Bumped on every change to a judge's bitmaps (epoch on a full invalidate),
+        # so derived views such as OccupancyMatrix know which rows to rebuild
+        self._versions: Dict[int, int] = {}
+        self._version_counter = 0
+        self.epoch = 0
+        self._lock = threading.RLock()
+
+    def _touch(self, judge_id: int):
+        self._version_counter += 1
+        self._versions[judge_id] = self._version_counter
+
+    def version(self, judge_id: int) -> int:
+        return self._versions.get(judge_id, 0)
+
+    @staticmethod
+    def _minutes(t: time) -> int:
+        return t.hour * 60 + t.minute
+
+    def slot_time(self, index: int) -> time:
+        """Start time of slot number `index` on the workday grid"""
+        minutes = self.day_start + index * self.slot_duration
+        return time(minutes // 60, minutes % 60)
+
+    def interval_mask(self, start: time, end: time) -> int:
+        """Bitmap of every grid slot that overlaps [start, end)"""
+        start_min = self._minutes(start)
+        end_min = self._minutes(end)
+        mask = 0
+        for i in range(self.num_slots):
+            slot_start = self.day_start + i * self.slot_duration
+            slot_end = slot_start + self.slot_duration
+            if not (slot_end <= start_min or slot_start >= end_min):
+                mask |= 1 << i
+        return mask
+
+    def _read(self, db: Session, judge_id: int, start_date: date, end_date: date, *exclude: Tuple[date, date]):
+        conditions = [
+            JudgeSchedule.judge_id == judge_id,
+            JudgeSchedule.date >= start_date,
+            JudgeSchedule.date < end_date
+        ]
+        for excluded_start, excluded_end in exclude:
+            conditions.append(not_(and_(
+                JudgeSchedule.date >= excluded_start,
+                JudgeSchedule.date < excluded_end
+            )))
+        return db.query(
+            JudgeSchedule.date, JudgeSchedule.start_time, JudgeSchedule.end_time
+        ).filter(and_(*conditions)).all()
+
+    def _replace(self, judge_id: int, rows, start_date: date, end_date: date):
+        """Make the judge's bitmaps exactly `rows` plus this process's uncommitted reservations"""
+        days = dict(self._pending.get(judge_id, {}))
+        for row_date, start_time, end_time in rows:
+            days[row_date] = days.get(row_date, 0) | self.interval_mask(start_time, end_time)
+        self._days[judge_id] = days
+        self._loaded[judge_id] = (start_date, end_date)
+        self._loaded_at[judge_id] = clock.monotonic()
+        self._touch(judge_id)
+
+    def _is_fresh(self, judge_id: int) -> bool:
+        return clock.monotonic() - self._loaded_at[judge_id] <= self.refresh_seconds
+
+    def ensure_loaded(self, db: Session, judge_id: int, start_date: date, end_date: date) -> int:
+        """
+        Make sure bookings in [start_date, end_date) are in the index.
+        Only the part of the window not loaded yet is fetched, in one range query,
+        and the rows are bucketed by date in memory; days already in the past are
+        dropped as the window moves forward. A window older than refresh_seconds,
+        or one not touching the requested range, is replaced by [start_date, end_date).
+        Returns the number of schedule rows read (0 when already loaded).
+        """
+        with self._lock:
+            loaded = self._loaded.get(judge_id)
+            if (not loaded or not self._is_fresh(judge_id)
+                    or end_date < loaded[0] or start_date > loaded[1]):
+                return self.reload(db, judge_id, start_date, end_date)
+            if loaded[0] <= start_date and end_date <= loaded[1]:
+                return 0
+
+            # Extend to the hull of both ranges, skipping what we already have
+            window_start, window_end = min(start_date, loaded[0]), max(end_date, loaded[1])
+            rows = self._read(db, judge_id, window_start, window_end, loaded)
+            days = self._days.setdefault(judge_id, {})
+            for row_date, start_time, end_time in rows:
+                days[row_date] = days.get(row_date, 0) | self.interval_mask(start_time, end_time)
+
+            # Past days are never searched again (unless asked for explicitly)
+            window_start = max(window_start, min(start_date, date.today()))
+            pending = self._pending.get(judge_id, {})
+            for day in [day for day in days if day < window_start and day not in pending]:
+                del days[day]
+            self._loaded[judge_id] = (window_start, window_end)
+            self._touch(judge_id)
+            return len(rows)
+
+    def reload(self, db: Session, judge_id: int, start_date: Optional[date] = None,
+               end_date: Optional[date] = None) -> int:
+        """
+        Re-read a judge's bookings in [start_date, end_date) (default: the loaded window)
+        in one range query, e.g. after finding a booking another worker made. The window
+        becomes exactly that range; bookings deleted elsewhere become free again and
+        this process's uncommitted reservations are kept.
+        Returns the number of schedule rows read.
+        """
+        with self._lock:
+            if start_date is None or end_date is None:
+                loaded = self._loaded.get(judge_id)
+                if not loaded:
+                    return 0
+                start_date, end_date = loaded
+            rows = self._read(db, judge_id, start_date, end_date)
+            self._replace(judge_id, rows, start_date, end_date)
+            return len(rows)
+
+    def _covers(self, judge_id: int, start_date: date, end_date: date) -> bool:
+        loaded = self._loaded.get(judge_id)
+        return (loaded is not None and loaded[0] <= start_date and end_date <= loaded[1]
+                and self._is_fresh(judge_id))
+
+    def ensure_loaded_many(self, db: Session, judge_ids: Iterable[int], start_date: date, end_date: date) -> int:
+        """
+        ensure_loaded for many judges: every judge whose window is missing, stale or
+        does not cover [start_date, end_date) is re-read in one range query over that
+        window. Returns the number of schedule rows read.
+        """
+        with self._lock:
+            to_read = [judge_id for judge_id in judge_ids if not self._covers(judge_id, start_date, end_date)]
+            if not to_read:
+                return 0
+
+            rows = db.query(
+                JudgeSchedule.judge_id, JudgeSchedule.date, JudgeSchedule.start_time, JudgeSchedule.end_time
+            ).filter(and_(
+                JudgeSchedule.judge_id.in_(to_read),
+                JudgeSchedule.date >= start_date,
+                JudgeSchedule.date < end_date
+            )).all()
+
+            by_judge: Dict[int, list] = {judge_id: [] for judge_id in to_read}
+            for judge_id, row_date, start_time, end_time in rows:
+                by_judge[judge_id].append((row_date, start_time, end_time))
+            for judge_id, judge_rows in by_judge.items():
+                self._replace(judge_id, judge_rows, start_date, end_date)
+            return len(rows)
+
+    def day_masks(self, judge_id: int, start_date: date, end_date: date) -> Tuple[int, Dict[date, int]]:
+        """(version, {date: bitmap}) of a judge's booked days in [start_date, end_date), read atomically"""
+        with self._lock:
+            days = self._days.get(judge_id, {})
+            return self.version(judge_id), {day: mask for day, mask in days.items()
+                                            if start_date <= day < end_date and mask}
+
+    def booked_mask(self, db: Session, judge_id: int, day: date) -> int:
+        """Bitmap of booked slots for a judge on a given day"""
+        with self._lock:
+            self.ensure_loaded(db, judge_id, day, day + timedelta(days=1))
+            return self._days[judge_id].get(day, 0)
+
+    def reserve(self, judge_id: int, day: date, start: time, end: time) -> bool:
+        """
+        Atomically mark [start, end) as booked.
+        Returns False if any of the slots were taken in the meantime.
+        """
+        mask = self.interval_mask(start, end)
+        with self._lock:
+            days = self._days.setdefault(judge_id, {})
+            current = days.get(day, 0)
+            if current & mask:
+                return False
+            days[day] = current | mask
+            pending = self._pending.setdefault(judge_id, {})
+            pending[day] = pending.get(day, 0) | mask
+            self._touch(judge_id)
+            return True
+
+    def mark_booked(self, judge_id: int, day: date, start: time, end: time):
+        """Record a booking found in the database (e.g. one the last reload could not see yet)"""
+        mask = self.interval_mask(start, end)
+        with self._lock:
+            days = self._days.setdefault(judge_id, {})
+            days[day] = days.get(day, 0) | mask
+            self._touch(judge_id)
+
+    def _drop_pending(self, judge_id: int, day: date, mask: int):
+        pending = self._pending.get(judge_id)
+        if pending and day in pending:
+            pending[day] &= ~mask
+            if not pending[day]:
+                del pending[day]
+            if not pending:
+                del self._pending[judge_id]
+
+    def confirm(self, judge_id: int, day: date, start: time, end: time):
+        """A reservation was committed: it is in the database now, so reloads will see it"""
+        with self._lock:
+            self._drop_pending(judge_id, day, self.interval_mask(start, end))
+
+    def release(self, judge_id: int, day: date, start: time, end: time):
+        """Undo a reservation (e.g. when the booking transaction is rolled back)"""
+        mask = self.interval_mask(start, end)
+        with self._lock:
+            self._drop_pending(judge_id, day, mask)
+            days = self._days.get(judge_id)
+            if days is not None and day in days:
+                days[day] &= ~mask
+                self._touch(judge_id)
+
+    def invalidate(self, judge_id: Optional[int] = None):
+        """Drop cached bookings for one judge, or for everyone (uncommitted reservations are kept)"""
+        with self._lock:
+            if judge_id is None:
+                self._days.clear()
+                self._loaded.clear()
+                self._loaded_at.clear()
+                self.epoch += 1
+            else:
+                self._days.pop(judge_id, None)
+                self._loaded.pop(judge_id, None)
+                self._loaded_at.pop(judge_id, None)
+                self._touch(judge_id)
@@ -0,0 +1,130 @@
+"""
+Bulk registration of users and judges (onboarding a district)
+
+Accounts arrive as CSV (username,email,password header) or JSON. Passwords
+are hashed in parallel, uniqueness of emails and usernames is checked with
+one set-based query, and rows are inserted in chunked commits. Every
+submitted row gets its own result, so one bad row does not fail the batch.
+"""
+import csv
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple, Type
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from app.auth import get_password_hash
+from app.bulk import load_json_items, validate_items
+from app.config import settings
+from app.executors import BoundedExecutor
+from app.schemas import BulkAccountResult, BulkRegisterResponse
+
+BULK_MAX_ACCOUNTS = 10000
+BULK_CHUNK_SIZE = 500  # accounts per commit
+
+CSV_COLUMNS = ("username", "email", "password")
+
+
+def parse_accounts(body: bytes, content_type: str, schema: Type[BaseModel]) -> List[Tuple[Optional[BaseModel], Optional[str]]]:
+    """
+    Parse a bulk registration body into (account, error) pairs, one per row.
+    Accepts CSV with a username,email,password header, a JSON array, or {"accounts": [...]}.
+    """
+    if "csv" in content_type:
+        try:
+            reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+        except UnicodeDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid CSV body: {e}")
+        missing = [column for column in CSV_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"CSV is missing columns: {', '.join(missing)}")
+        raw_items = [{column: row[column] for column in CSV_COLUMNS} for row in reader]
+    else:
+        raw_items = load_json_items(body, "accounts")
+
+    return validate_items(raw_items, schema, BULK_MAX_ACCOUNTS, "accounts")
+
+
+def hash_passwords(passwords: List[str], executor: Optional[BoundedExecutor] = None) -> List[str]:
+    """
+    Hash many passwords in parallel, preserving order.
+    Without an executor a temporary pool with one thread per core is used (bcrypt
+    releases the GIL). With the shared password executor, hashes are submitted one
+    worker-sized wave at a time through its admission cap (waiting for room rather
+    than failing), so logins can still get in between waves.
+    """
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as pool:
+            return list(pool.map(get_password_hash, passwords))
+
+    wave = max(1, settings.PASSWORD_HASH_WORKERS)
+    hashes = []
+    for start in range(0, len(passwords), wave):
+        futures = [executor.submit_when_free(get_password_hash, password)
+                   for password in passwords[start:start + wave]]
+        hashes.extend(future.result() for future in futures)
+    return hashes
+
+
+def register_accounts(db: Session, model: type, entries: List[Tuple[Optional[BaseModel], Optional[str]]],
+                      executor: Optional[BoundedExecutor] = None) -> BulkRegisterResponse:
+    """Create User or Judge rows for every valid entry; duplicate emails/usernames are reported per row"""
+    # Keep attributes loaded across the per-chunk commits instead of reloading every row
+    db.expire_on_commit = False
+
+    results = [BulkAccountResult(index=i, status="error", error=error) for i, (_, error) in enumerate(entries)]
+
+    # One query for every email or username that is already registered
+    emails = {item.email for item, _ in entries if item}
+    usernames = {item.username for item, _ in entries if item}
+    taken_emails, taken_usernames = set(), set()
+    if emails:
+        for email, username in db.query(model.email, model.username).filter(
+            or_(model.email.in_(emails), model.username.in_(usernames))
+        ).all():
+            taken_emails.add(email)
+            taken_usernames.add(username)
+
+    accepted = []
+    for i, (item, _) in enumerate(entries):
+        if item is None:
+            continue
+        results[i].username = item.username
+        results[i].email = item.email
+        if item.email in taken_emails:
+            results[i].error = "Email already registered"
+            continue
+        if item.username in taken_usernames:
+            results[i].error = "Username already taken"
+            continue
+        # Later rows in the same batch cannot reuse an earlier row's email or username
+        taken_emails.add(item.email)
+        taken_usernames.add(item.username)
+        accepted.append((i, item))
+
+    hashes = hash_passwords([item.password for _, item in accepted], executor)
+    pending = [
+        (i, model(username=item.username, email=item.email, password=hashed))
+        for (i, item), hashed in zip(accepted, hashes)
+    ]
+
+    for start in range(0, len(pending), BULK_CHUNK_SIZE):
+        chunk = pending[start:start + BULK_CHUNK_SIZE]
+        db.add_all([account for _, account in chunk])
+        try:
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Bulk registration error: {e}")
+            for i, _ in chunk:
+                results[i].error = "Could not save account"
+            continue
+        for i, account in chunk:
+            results[i].id = account.id
+            results[i].status = "created"
+            results[i].error = None
+
+    created = sum(1 for r in results if r.status == "created")
+    return BulkRegisterResponse(total=len(results), created=created, failed=len(results) - created, results=results)
@@ -0,0 +1,141 @@
+"""
+Keyset (cursor) pagination and list filters
+
+List endpoints keep returning a plain JSON array. When `limit` is given, at
+most that many rows are returned and, if more rows follow, an opaque cursor
+for the next page is sent in the X-Next-Cursor response header. Pages are
+read with a WHERE on the sort key (e.g. (filed_at, id) < cursor) instead of
+OFFSET, so every page costs the same no matter how deep it is.
+"""
+import base64
+import json
+from datetime import date, datetime, time
+from typing import List, Optional, Sequence
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, or_, false, func, DateTime
+from sqlalchemy.orm import Query as SAQuery
+from app.models import Case, CaseStatus, CaseComplexity
+
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """Query parameters shared by paginated list endpoints"""
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size (omit to get every row)"),
+        cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page")
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+def case_filters(
+    status: Optional[CaseStatus] = None,
+    complexity: Optional[CaseComplexity] = None,
+    judge_id: Optional[int] = None,
+    filed_from: Optional[date] = None,
+    filed_to: Optional[date] = None,
+    scheduled_from: Optional[date] = None,
+    scheduled_to: Optional[date] = None
+) -> list:
+    """Server-side filters for case lists (date ranges are inclusive)"""
+    conditions = []
+    if status is not None:
+        conditions.append(Case.status == status)
+    if complexity is not None:
+        conditions.append(Case.complexity == complexity)
+    if judge_id is not None:
+        conditions.append(Case.judge_id == judge_id)
+    if filed_from is not None:
+        conditions.append(Case.filed_at >= datetime.combine(filed_from, time.min))
+    if filed_to is not None:
+        conditions.append(Case.filed_at <= datetime.combine(filed_to, time.max))
+    if scheduled_from is not None:
+        conditions.append(Case.scheduled_date >= scheduled_from)
+    if scheduled_to is not None:
+        conditions.append(Case.scheduled_date <= scheduled_to)
+    return conditions
+
+
+def encode_cursor(values: list) -> str:
+    payload = [v.isoformat() if isinstance(v, (date, time)) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> list:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise ValueError("cursor does not match this listing")
+        values = []
+        for column, value in zip(columns, payload):
+            python_type = column.type.python_type
+            if value is not None and python_type in (datetime, date, time):
+                value = python_type.fromisoformat(value)
+            values.append(value)
+        return values
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+
+def _after(column, value, descending: bool):
+    """column strictly after value in sort order (NULLs sort first, as in MySQL/SQLite)"""
+    if value is None:
+        # NULLs come first ascending and last descending
+        return false() if descending else column.isnot(None)
+    if descending:
+        return or_(column < value, column.is_(None))
+    return column > value
+
+
+def _equal(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def keyset_condition(keys: Sequence, values: list, descending: bool):
+    """Row-value comparison (keys) > values, spelled out so NULL keys work"""
+    clauses = []
+    for i, key in enumerate(keys):
+        prefix = [_equal(keys[j], values[j]) for j in range(i)]
+        clauses.append(and_(*prefix, _after(key, values[i], descending)))
+    return or_(*clauses)
+
+
+def _sort_keys(query: SAQuery, columns: Sequence, values: Optional[list] = None):
+    """
+    SQL expressions to sort and compare on.
+    SQLite keeps server-default timestamps as text without microseconds but binds
+    datetime parameters with them, so DateTime keys are normalised with datetime().
+    """
+    if query.session.get_bind().dialect.name != "sqlite":
+        return list(columns), values
+    keys = [func.datetime(c) if isinstance(c.type, DateTime) else c for c in columns]
+    if values is not None:
+        values = [func.datetime(v) if isinstance(c.type, DateTime) and v is not None else v
+                  for c, v in zip(columns, values)]
+    return keys, values
+
+
+def paginate(query: SAQuery, columns: Sequence, page: PageParams, response: Response,
+             descending: bool = False) -> List:
+    """
+    Order `query` by `columns` (the last one must be unique, e.g. id) and return one page.
+    Sets the X-Next-Cursor header when there are more rows.
+    """
+    values = decode_cursor(page.cursor, columns) if page.cursor else None
+    keys, values = _sort_keys(query, columns, values)
+    if values is not None:
+        query = query.filter(keyset_condition(keys, values, descending))
+    query = query.order_by(*[key.desc() if descending else key for key in keys])
+
+    if page.limit is None:
+        return query.all()
+
+    rows = query.limit(page.limit + 1).all()
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(rows[-1], column.key) for column in columns])
+    return rows
@@ -0,0 +1,60 @@
+"""
+Column-restricted case listings
+
+List endpoints return full CaseResponse rows by default. `?view=summary` returns
+CaseSummary rows and `?fields=id,title,status` returns just the named fields;
+in both cases only those columns (plus the sort keys) are loaded from the
+database, so the large TEXT columns are neither transferred nor serialized.
+"""
+from typing import Literal, Optional, Sequence
+from fastapi import HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm import Query as SAQuery
+from app.models import Case
+from app.schemas import CaseResponse, CaseSummary
+from app.pagination import PageParams, paginate, NEXT_CURSOR_HEADER
+
+CASE_FIELDS = list(CaseResponse.model_fields)
+SUMMARY_FIELDS = list(CaseSummary.model_fields)
+
+
+class CaseFieldParams:
+    """?view= / ?fields= query parameters shared by case list endpoints"""
+
+    def __init__(
+        self,
+        view: Literal["full", "summary"] = Query("full", description="summary omits description, sections and judgment"),
+        fields: Optional[str] = Query(None, description="Comma-separated CaseResponse fields to return")
+    ):
+        if fields:
+            requested = [f.strip() for f in fields.split(",") if f.strip()]
+            unknown = [f for f in requested if f not in CASE_FIELDS]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+            # Keep the request order, drop duplicates
+            self.fields = list(dict.fromkeys(requested))
+        elif view == "summary":
+            self.fields = SUMMARY_FIELDS
+        else:
+            self.fields = None
+
+
+def list_cases(query: SAQuery, columns: Sequence, page: PageParams, response: Response,
+               projection: CaseFieldParams, descending: bool = False):
+    """
+    Paginate a case query, loading only the requested columns.
+    Returns ORM rows for the full view (validated by the endpoint's response_model),
+    or a ready JSONResponse for summary / sparse fieldsets.
+    """
+    if projection.fields is None:
+        return paginate(query, columns, page, response, descending)
+
+    load_fields = list(dict.fromkeys(projection.fields + [column.key for column in columns]))
+    query = query.options(load_only(*[getattr(Case, name) for name in load_fields]))
+    rows = paginate(query, columns, page, response, descending)
+
+    content = jsonable_encoder([{name: getattr(row, name) for name in projection.fields} for row in rows])
+    headers = {NEXT_CURSOR_HEADER: response.headers[NEXT_CURSOR_HEADER]} if NEXT_CURSOR_HEADER in response.headers else None
+    return JSONResponse(content, headers=headers)
@@ -1,41 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, case, select
+from app.database import get_db, get_async_db, SessionLocal, get_pool_status
 from app.models import Admin, Case, User, Judge, CaseStatus
 from app.schemas import AdminCreate, AdminResponse, AdminAnalytics, CaseResponse, CaseUpdate, UserResponse, JudgeResponse
-from app.auth import get_password_hash
-from datetime import datetime
-from typing import List
+from app.auth import hash_password
+from app.workload import workload_tracker
+from app.storage import release_document
+from app.pagination import PageParams, case_filters, paginate
+from app.projections import CaseFieldParams, list_cases
+from app.cache import TTLCache
+from app.config import settings
+from datetime import datetime, date, time
+from typing import List, Literal, Iterator
+import csv
+import enum
+import io
+import json
 
 router = APIRouter()
 
+analytics_cache = TTLCache(settings.ANALYTICS_CACHE_TTL_SECONDS, depends_on=(Case, User, Judge))
+
+# Case export streams rows straight from a server-side cursor in chunks of this size
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_COLUMNS = list(CaseResponse.model_fields)
+
 @router.post("/register", response_model=AdminResponse, status_code=status.HTTP_201_CREATED)
 def register_admin(admin: AdminCreate, db: Session = Depends(get_db)):
     db_admin = db.query(Admin).filter(Admin.email == admin.email).first()
     if db_admin:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(admin.password)
+    hashed_password = hash_password(admin.password)
     new_admin = Admin(email=admin.email, password=hashed_password)
     db.add(new_admin)
     db.commit()
     db.refresh(new_admin)
     return new_admin
 
-@router.get("/analytics", response_model=AdminAnalytics)
-def get_admin_analytics(db: Session = Depends(get_db)):
-    """Get system-wide analytics"""
-    total_cases = db.query(Case).count()
-    total_users = db.query(User).count()
-    total_judges = db.query(Judge).count()
-    pending_cases = db.query(Case).filter(Case.status == CaseStatus.PENDING).count()
-    scheduled_cases = db.query(Case).filter(Case.status == CaseStatus.SCHEDULED).count()
-    completed_cases = db.query(Case).filter(Case.status == CaseStatus.COMPLETED).count()
-    
-    # Cases this month
+async def compute_admin_analytics(db: AsyncSession) -> AdminAnalytics:
+    """System-wide counts in a single pass over cases (same shape as the case_analytics view)"""
     current_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    cases_this_month = db.query(Case).filter(Case.filed_at >= current_month).count()
+    
+    row = (await db.execute(select(
+        func.count(Case.id),
+        func.coalesce(func.sum(case((Case.status == CaseStatus.PENDING, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((Case.status == CaseStatus.SCHEDULED, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((Case.status == CaseStatus.COMPLETED, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((Case.filed_at >= current_month, 1), else_=0)), 0),
+        select(func.count(User.id)).scalar_subquery(),
+        select(func.count(Judge.id)).scalar_subquery()
+    ))).one()
+    total_cases, pending_cases, scheduled_cases, completed_cases, cases_this_month, total_users, total_judges = row
     
     return AdminAnalytics(
         total_cases=total_cases,
@@ -47,12 +66,66 @@ def get_admin_analytics(db: Session = Depends(get_db)):
         cases_this_month=cases_this_month
     )
 
+@router.get("/analytics", response_model=AdminAnalytics)
+async def get_admin_analytics(db: AsyncSession = Depends(get_async_db)):
+    """Get system-wide analytics (cached briefly, refreshed on every case write)"""
+    return await analytics_cache.get_or_compute_async("admin", lambda: compute_admin_analytics(db))
+
 # Case Management
 @router.get("/cases", response_model=List[CaseResponse])
-def get_all_cases(db: Session = Depends(get_db)):
-    """Get all cases in the system"""
-    cases = db.query(Case).order_by(Case.filed_at.desc()).all()
-    return cases
+def get_all_cases(response: Response, page: PageParams = Depends(),
+                  filters: list = Depends(case_filters), projection: CaseFieldParams = Depends(),
+                  db: Session = Depends(get_db)):
+    """Get all cases in the system (newest first; pass limit/cursor to page, view=summary or fields= to trim)"""
+    query = db.query(Case).filter(*filters)
+    return list_cases(query, [Case.filed_at, Case.id], page, response, projection, descending=True)
+
+def _export_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+def iter_case_export(filters: list, export_format: str) -> Iterator[str]:
+    """Yield the export one chunk of rows at a time; memory use does not grow with the table"""
+    # Own session: the request's session is closed before the body finishes streaming
+    db = SessionLocal()
+    try:
+        stmt = select(*[getattr(Case, name) for name in EXPORT_COLUMNS]).where(*filters).order_by(
+            Case.filed_at.desc(), Case.id.desc()
+        ).execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        result = db.execute(stmt)
+        
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
+            yield buffer.getvalue()
+            for rows in result.partitions():
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows([["" if v is None else _export_value(v) for v in row] for row in rows])
+                yield buffer.getvalue()
+        else:
+            for rows in result.partitions():
+                yield "".join(
+                    json.dumps(dict(zip(EXPORT_COLUMNS, map(_export_value, row)))) + "\n"
+                    for row in rows
+                )
+    finally:
+        db.close()
+
+@router.get("/cases/export")
+def export_cases(format: Literal["ndjson", "csv"] = "ndjson", filters: list = Depends(case_filters)):
+    """Stream every case (or the filtered ones) as NDJSON or CSV for reporting"""
+    if format == "csv":
+        return StreamingResponse(
+            iter_case_export(filters, "csv"),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=cases.csv"}
+        )
+    return StreamingResponse(iter_case_export(filters, "ndjson"), media_type="application/x-ndjson")
 
 @router.put("/cases/{case_id}", response_model=CaseResponse)
 def update_case(case_id: int, case_update: CaseUpdate, db: Session = Depends(get_db)):
@@ -61,6 +134,8 @@ def update_case(case_id: int, case_update: CaseUpdate, db: Session = Depends(get
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
     
+    previous_status = case.status
+    
     # Update fields if provided
     if case_update.title is not None:
         case.title = case_update.title
@@ -78,6 +153,7 @@ def update_case(case_id: int, case_update: CaseUpdate, db: Session = Depends(get
     
     db.commit()
     db.refresh(case)
+    workload_tracker.record_status_change(case.judge_id, previous_status, case.status)
     return case
 
 @router.delete("/cases/{case_id}")
@@ -87,16 +163,18 @@ def delete_case(case_id: int, db: Session = Depends(get_db)):
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
     
+    judge_id, previous_status, document_path = case.judge_id, case.status, case.document_path
     db.delete(case)
     db.commit()
+    workload_tracker.record_status_change(judge_id, previous_status, None)
+    release_document(db, document_path)
     return {"message": "Case deleted successfully"}
 
 # User Management
 @router.get("/users", response_model=List[UserResponse])
-def get_all_users(db: Session = Depends(get_db)):
-    """Get all users"""
-    users = db.query(User).order_by(User.created_at.desc()).all()
-    return users
+def get_all_users(response: Response, page: PageParams = Depends(), db: Session = Depends(get_db)):
+    """Get all users (newest first; pass limit/cursor to page)"""
+    return paginate(db.query(User), [User.created_at, User.id], page, response, descending=True)
 
 @router.put("/users/{user_id}", response_model=UserResponse)
 def update_user(user_id: int, username: str = None, email: str = None, db: Session = Depends(get_db)):
@@ -137,10 +215,9 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
 
 # Judge Management
 @router.get("/judges", response_model=List[JudgeResponse])
-def get_all_judges(db: Session = Depends(get_db)):
-    """Get all judges"""
-    judges = db.query(Judge).order_by(Judge.created_at.desc()).all()
-    return judges
+def get_all_judges(response: Response, page: PageParams = Depends(), db: Session = Depends(get_db)):
+    """Get all judges (newest first; pass limit/cursor to page)"""
+    return paginate(db.query(Judge), [Judge.created_at, Judge.id], page, response, descending=True)
 
 @router.put("/judges/{judge_id}", response_model=JudgeResponse)
 def update_judge(judge_id: int, username: str = None, email: str = None, db: Session = Depends(get_db)):
@@ -177,4 +254,11 @@ def delete_judge(judge_id: int, db: Session = Depends(get_db)):
     
     db.delete(judge)
     db.commit()
+    workload_tracker.invalidate()
     return {"message": "Judge deleted successfully"}
+
+# Operations
+@router.get("/db-pool")
+def get_db_pool_status():
+    """Database connection pool usage (checked-out connections, overflow, checkout wait times)"""
+    return get_pool_status()
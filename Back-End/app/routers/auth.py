@@ -1,16 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models import User, Judge, Admin
 from app.schemas import LoginRequest, Token
-from app.auth import verify_password, create_access_token
+from app.auth import authenticate_password, create_access_token
 
 router = APIRouter()
 
+async def verify_credentials(db: AsyncSession, account, password: str) -> bool:
+    """Check a password (off the event loop), upgrading the stored hash if BCRYPT_ROUNDS changed"""
+    if not account:
+        return False
+    valid, new_hash = await authenticate_password(password, account.password)
+    if valid and new_hash:
+        account.password = new_hash
+        await db.commit()
+    return valid
+
 @router.post("/login/user", response_model=Token)
-def login_user(request: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == request.email).first()
-    if not user or not verify_password(request.password, user.password):
+async def login_user(request: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    user = (await db.execute(select(User).where(User.email == request.email))).scalars().first()
+    if not await verify_credentials(db, user, request.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     
     access_token = create_access_token(data={"sub": user.email, "role": "user", "user_id": user.id})
@@ -23,9 +34,9 @@ def login_user(request: LoginRequest, db: Session = Depends(get_db)):
     }
 
 @router.post("/login/judge", response_model=Token)
-def login_judge(request: LoginRequest, db: Session = Depends(get_db)):
-    judge = db.query(Judge).filter(Judge.email == request.email).first()
-    if not judge or not verify_password(request.password, judge.password):
+async def login_judge(request: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    judge = (await db.execute(select(Judge).where(Judge.email == request.email))).scalars().first()
+    if not await verify_credentials(db, judge, request.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     
     access_token = create_access_token(data={"sub": judge.email, "role": "judge", "judge_id": judge.id})
@@ -38,9 +49,9 @@ def login_judge(request: LoginRequest, db: Session = Depends(get_db)):
     }
 
 @router.post("/login/admin", response_model=Token)
-def login_admin(request: LoginRequest, db: Session = Depends(get_db)):
-    admin = db.query(Admin).filter(Admin.email == request.email).first()
-    if not admin or not verify_password(request.password, admin.password):
+async def login_admin(request: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    admin = (await db.execute(select(Admin).where(Admin.email == request.email))).scalars().first()
+    if not await verify_credentials(db, admin, request.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     
     access_token = create_access_token(data={"sub": admin.email, "role": "admin", "admin_id": admin.id})
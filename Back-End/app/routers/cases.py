@@ -1,25 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request, Response
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import or_
-from app.database import get_db
-from app.models import Case, User, CaseStatus
-from app.schemas import CaseCreate, CaseResponse
+from app.database import get_db, get_async_db, SessionLocal
+from app.models import Case, User, CaseStatus, CaseComplexity, SchedulingClaim
+from app.schemas import CaseCreate, CaseResponse, FiledCaseResponse, SchedulingExplain, BulkCaseItem, BulkCaseResult, BulkFileResponse, SchedulingStatusResponse
 from app.scheduler import MultiLevelQueueScheduler
-from typing import List, Optional
+from app.scheduling_queue import scheduling_queue
+from app.config import settings
+from app.storage import save_upload, restore_upload, UploadTooLargeError
+from app.executors import run_blocking
+from app.metrics import CASES_FILED
+from app.bulk import load_json_items, validate_items
+from app.pagination import PageParams, case_filters
+from app.projections import CaseFieldParams, list_cases
+from typing import List, Optional, Tuple
 from datetime import datetime
-import os
+import json
 import uuid
 
 router = APIRouter()
 
-# Create uploads directory if it doesn't exist
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+# Bulk filing limits
+BULK_MAX_CASES = 10000
+BULK_CHUNK_SIZE = 200  # cases per commit
 
 def generate_case_number() -> str:
     """Generate unique case number"""
     timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    return f"CASE-{timestamp}"
+    # Random suffix so cases filed within the same second do not collide
+    # (8 hex digits: 4 collided under sustained load of ~20 filings/s)
+    return f"CASE-{timestamp}-{uuid.uuid4().hex[:8].upper()}"
 
 def calculate_complexity_from_sections(sections_str: str) -> str:
     """
@@ -45,19 +56,160 @@ def calculate_complexity_from_sections(sections_str: str) -> str:
     else:
         return 'highly_complex'
 
-@router.post("/file", response_model=CaseResponse, status_code=status.HTTP_201_CREATED)
+def parse_bulk_cases(body: bytes, content_type: str) -> List[Tuple[Optional[BulkCaseItem], Optional[str]]]:
+    """
+    Parse a bulk filing body into (case, error) pairs, one per submitted case.
+    Accepts a JSON array, a JSON object with a "cases" array, or NDJSON (one case per line).
+    """
+    if "ndjson" in content_type:
+        raw_items = []
+        for line in body.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            try:
+                raw_items.append(json.loads(line))
+            except ValueError as e:
+                raw_items.append(ValueError(f"Invalid JSON: {e}"))
+    else:
+        raw_items = load_json_items(body, "cases")
+    
+    return validate_items(raw_items, BulkCaseItem, BULK_MAX_CASES, "cases")
+
+def file_cases_in_bulk(entries: List[Tuple[Optional[BulkCaseItem], Optional[str]]], db: Session,
+                       explain: bool = False) -> BulkFileResponse:
+    """
+    Insert a batch of cases in chunked commits, then schedule the whole batch in queue order
+    With explain=True every inserted case carries its scheduler statistics
+    """
+    # Keep attributes loaded across the per-chunk commits instead of reloading every case
+    db.expire_on_commit = False
+    
+    results = [BulkCaseResult(index=i, status="error", error=error) for i, (_, error) in enumerate(entries)]
+    
+    # Set-based checks: one query for users, one for externally supplied case numbers
+    user_ids = {item.user_id for item, _ in entries if item}
+    known_users = {row[0] for row in db.query(User.id).filter(User.id.in_(user_ids)).all()} if user_ids else set()
+    supplied_numbers = [item.case_number for item, _ in entries if item and item.case_number]
+    taken_numbers = {row[0] for row in db.query(Case.case_number).filter(
+        Case.case_number.in_(supplied_numbers)
+    ).all()} if supplied_numbers else set()
+    
+    # Generated numbers share one unique prefix per batch
+    batch_prefix = generate_case_number()
+    
+    pending = []
+    seen_numbers = set()
+    for i, (item, _) in enumerate(entries):
+        if item is None:
+            continue
+        if item.user_id not in known_users:
+            results[i].error = "User not found"
+            continue
+        if item.case_number and (item.case_number in taken_numbers or item.case_number in seen_numbers):
+            results[i].error = "Case number already exists"
+            continue
+        
+        case_number = item.case_number or f"{batch_prefix}-{i + 1:05d}"
+        seen_numbers.add(case_number)
+        pending.append((i, Case(
+            case_number=case_number,
+            title=item.title,
+            description=item.description,
+            sections=item.sections,
+            complexity=CaseComplexity(calculate_complexity_from_sections(item.sections)),
+            user_id=item.user_id,
+            status=CaseStatus.PENDING
+        )))
+    
+    # Bulk insert, one commit per chunk
+    inserted = []
+    for start in range(0, len(pending), BULK_CHUNK_SIZE):
+        chunk = pending[start:start + BULK_CHUNK_SIZE]
+        db.add_all([case for _, case in chunk])
+        try:
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Bulk insert error: {e}")
+            for i, _ in chunk:
+                results[i].error = "Could not save case"
+            continue
+        inserted.extend(chunk)
+        for _, case in chunk:
+            CASES_FILED.inc(complexity=case.complexity.value)
+    
+    # Run P-MLQ over the whole batch in priority order
+    scheduler = MultiLevelQueueScheduler(db)
+    scheduled = scheduler.schedule_cases([case for _, case in inserted], chunk_size=BULK_CHUNK_SIZE)
+    
+    for i, case in inserted:
+        is_scheduled = scheduled.get(case.id, False)
+        stats = scheduler.stats_by_case.get(case.id) if explain else None
+        results[i] = BulkCaseResult(
+            index=i,
+            case_id=case.id,
+            case_number=case.case_number,
+            complexity=case.complexity,
+            status="scheduled" if is_scheduled else "pending",
+            judge_id=case.judge_id if is_scheduled else None,
+            scheduled_date=case.scheduled_date if is_scheduled else None,
+            scheduled_time=case.scheduled_time if is_scheduled else None,
+            explain=stats.as_dict() if stats else None
+        )
+    
+    return BulkFileResponse(
+        total=len(results),
+        scheduled=sum(1 for r in results if r.status == "scheduled"),
+        pending=sum(1 for r in results if r.status == "pending"),
+        failed=sum(1 for r in results if r.status == "error"),
+        results=results
+    )
+
+@router.post("/bulk", response_model=BulkFileResponse)
+async def file_cases_bulk(request: Request, explain: bool = False, db: Session = Depends(get_db)):
+    """
+    File many cases at once (e.g. transfers from other courts)
+    Body: JSON array / {"cases": [...]} or NDJSON with title, description, sections, user_id
+    ?explain=true adds per-case scheduler statistics (days scanned, queries, timings)
+    """
+    body = await request.body()
+    entries = await run_blocking(parse_bulk_cases, body, request.headers.get("content-type", ""))
+    return await run_blocking(file_cases_in_bulk, entries, db, explain)
+
+def schedule_filed_case(case_id: int) -> Tuple[bool, Optional[dict]]:
+    """
+    Run P-MLQ for one case in its own session (blocking - call from a worker thread)
+    Returns (scheduled, scheduler statistics or None)
+    """
+    db = SessionLocal()
+    try:
+        case = db.get(Case, case_id)
+        if case is None:
+            return False, None
+        scheduler = MultiLevelQueueScheduler(db)
+        scheduled = scheduler.schedule_case(case)
+        return scheduled, scheduler.stats.as_dict() if scheduler.stats else None
+    finally:
+        db.close()
+
+@router.post("/file", response_model=FiledCaseResponse, status_code=status.HTTP_201_CREATED)
 async def file_case(
     title: str = Form(...),
     description: str = Form(...),
     sections: str = Form(...),
     user_id: int = Form(...),
     document: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db)
+    explain: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """File a new case with optional document upload"""
+    """
+    File a new case with optional document upload
+    ?explain=true schedules the case inline (not on the background queue) and adds the
+    scheduler statistics (days scanned, queries, timings) to the response
+    """
     try:
         # Verify user exists
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.get(User, user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -69,16 +221,11 @@ async def file_case(
         document_filename = None
         if document and document.filename:
             try:
-                # Generate unique filename
-                file_extension = document.filename.split('.')[-1] if '.' in document.filename else 'bin'
-                unique_filename = f"{uuid.uuid4()}.{file_extension}"
-                document_path = os.path.join(UPLOAD_DIR, unique_filename)
+                # Hash the spooled upload and store it once per distinct content
+                document_path = await save_upload(document)
                 document_filename = document.filename
-                
-                # Save file
-                content = await document.read()
-                with open(document_path, 'wb') as f:
-                    f.write(content)
+            except UploadTooLargeError as e:
+                raise HTTPException(status_code=413, detail=str(e))
             except Exception as e:
                 print(f"File upload error: {e}")
                 # Continue without document if upload fails
@@ -99,13 +246,23 @@ async def file_case(
         )
         
         db.add(new_case)
-        db.commit()
-        db.refresh(new_case)
+        await db.commit()
+        await db.refresh(new_case)
+        CASES_FILED.inc(complexity=complexity)
+        if document_path:
+            # The stored copy may have been released by a concurrent case deletion
+            await restore_upload(document, document_path)
         
-        # Schedule the case using multi-level queue algorithm
+        # Hand the case to the background scheduler and return it as PENDING;
+        # poll /api/cases/{id}/scheduling-status for the outcome
+        if not explain and settings.BACKGROUND_SCHEDULING and await run_blocking(scheduling_queue.submit, new_case.id):
+            return new_case
+        
+        # Queue full, background scheduling disabled or explain requested - schedule inline
+        # using multi-level queue algorithm (on the blocking executor, the scheduler is synchronous)
+        stats = None
         try:
-            scheduler = MultiLevelQueueScheduler(db)
-            scheduled = scheduler.schedule_case(new_case)
+            scheduled, stats = await run_blocking(schedule_filed_case, new_case.id)
             
             if not scheduled:
                 # Case is filed but not scheduled yet
@@ -114,40 +271,65 @@ async def file_case(
             print(f"Scheduling error: {e}")
             # Continue even if scheduling fails
         
-        db.refresh(new_case)
-        return new_case
+        await db.refresh(new_case)
+        response = FiledCaseResponse.model_validate(new_case)
+        if explain and stats:
+            response.explain = SchedulingExplain(**stats)
+        return response
         
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"Error filing case: {e}")
         raise HTTPException(status_code=500, detail=f"Error filing case: {str(e)}")
 
 @router.get("/user/{user_id}", response_model=List[CaseResponse])
-def get_user_cases(user_id: int, db: Session = Depends(get_db)):
-    """Get all cases filed by a user"""
-    cases = db.query(Case).filter(Case.user_id == user_id).order_by(Case.filed_at.desc()).all()
-    return cases
+def get_user_cases(user_id: int, response: Response, page: PageParams = Depends(),
+                   filters: list = Depends(case_filters), projection: CaseFieldParams = Depends(),
+                   db: Session = Depends(get_db)):
+    """Get all cases filed by a user (newest first; pass limit/cursor to page, view=summary or fields= to trim)"""
+    query = db.query(Case).filter(Case.user_id == user_id, *filters)
+    return list_cases(query, [Case.filed_at, Case.id], page, response, projection, descending=True)
 
 @router.get("/judge/{judge_id}", response_model=List[CaseResponse])
-def get_judge_cases(judge_id: int, db: Session = Depends(get_db)):
-    """Get all cases assigned to a judge"""
-    cases = db.query(Case).filter(
-        Case.judge_id == judge_id
-    ).order_by(Case.scheduled_date, Case.scheduled_time).all()
-    return cases
+def get_judge_cases(judge_id: int, response: Response, page: PageParams = Depends(),
+                    filters: list = Depends(case_filters), projection: CaseFieldParams = Depends(),
+                    db: Session = Depends(get_db)):
+    """Get all cases assigned to a judge (by schedule; pass limit/cursor to page, view=summary or fields= to trim)"""
+    query = db.query(Case).filter(Case.judge_id == judge_id, *filters)
+    return list_cases(query, [Case.scheduled_date, Case.scheduled_time, Case.id], page, response, projection)
+
+@router.get("/{case_id}/scheduling-status", response_model=SchedulingStatusResponse)
+async def get_scheduling_status(case_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Check whether a filed case has been scheduled yet"""
+    case = await db.get(Case, case_id)
+    if not case:
+        raise HTTPException(status_code=404, detail="Case not found")
+    # Claims live in the database, so this is right whichever worker queued the case;
+    # an expired claim (dead worker) no longer counts until another worker takes it over
+    claim = await db.get(SchedulingClaim, case_id)
+    return SchedulingStatusResponse(
+        case_id=case.id,
+        status=case.status,
+        queued=claim is not None and scheduling_queue.claim_is_live(claim) and case.status == CaseStatus.PENDING,
+        judge_id=case.judge_id,
+        scheduled_date=case.scheduled_date,
+        scheduled_time=case.scheduled_time
+    )
 
 @router.get("/{case_id}", response_model=CaseResponse)
-def get_case(case_id: int, db: Session = Depends(get_db)):
+async def get_case(case_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get case details"""
-    case = db.query(Case).filter(Case.id == case_id).first()
+    case = await db.get(Case, case_id)
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
     return case
 
 @router.get("/", response_model=List[CaseResponse])
-def get_all_cases(db: Session = Depends(get_db)):
-    """Get all cases (admin only)"""
-    cases = db.query(Case).order_by(Case.filed_at.desc()).all()
-    return cases
+def get_all_cases(response: Response, page: PageParams = Depends(),
+                  filters: list = Depends(case_filters), projection: CaseFieldParams = Depends(),
+                  db: Session = Depends(get_db)):
+    """Get all cases (admin only; newest first, pass limit/cursor to page, view=summary or fields= to trim)"""
+    query = db.query(Case).filter(*filters)
+    return list_cases(query, [Case.filed_at, Case.id], page, response, projection, descending=True)
@@ -1,28 +1,97 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, case, select
+from app.database import get_db, get_async_db
 from app.models import Judge, Case, Hearing, CaseStatus
-from app.schemas import JudgeCreate, JudgeResponse, ScheduleHearingRequest, ScheduleHearingResponse, CloseCaseRequest, JudgeAnalytics
-from app.auth import get_password_hash
+from app.schemas import JudgeCreate, JudgeResponse, ScheduleHearingRequest, ScheduleHearingResponse, CloseCaseRequest, JudgeAnalytics, JudgeAnalyticsSummary, BulkRegisterResponse
+from app.auth import hash_password
 from app.scheduler import MultiLevelQueueScheduler
+from app.workload import workload_tracker
+from app.cache import TTLCache
+from app.executors import run_blocking, password_executor
+from app.onboarding import parse_accounts, register_accounts
+from app.config import settings
 from datetime import datetime, timedelta
+from typing import Dict, List, Optional
 
 router = APIRouter()
 
+analytics_cache = TTLCache(settings.ANALYTICS_CACHE_TTL_SECONDS, depends_on=(Case, Judge))
+
+async def compute_judge_analytics(db: AsyncSession, judge_ids: List[int]) -> Dict[int, JudgeAnalytics]:
+    """Analytics for the given judges from one GROUP BY judge_id, status aggregate"""
+    current_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    
+    rows = (await db.execute(select(
+        Case.judge_id,
+        Case.status,
+        func.count(Case.id),
+        func.coalesce(func.sum(case((Case.filed_at >= current_month, 1), else_=0)), 0)
+    ).where(Case.judge_id.in_(judge_ids)).group_by(Case.judge_id, Case.status))).all()
+    
+    counts = {
+        judge_id: {"total_cases": 0, "pending_cases": 0, "scheduled_cases": 0,
+                   "completed_cases": 0, "cases_this_month": 0}
+        for judge_id in judge_ids
+    }
+    status_fields = {
+        CaseStatus.PENDING: "pending_cases",
+        CaseStatus.SCHEDULED: "scheduled_cases",
+        CaseStatus.COMPLETED: "completed_cases"
+    }
+    for judge_id, case_status, count, this_month in rows:
+        judge_counts = counts[judge_id]
+        judge_counts["total_cases"] += count
+        judge_counts["cases_this_month"] += this_month
+        if case_status in status_fields:
+            judge_counts[status_fields[case_status]] += count
+    
+    return {judge_id: JudgeAnalytics(**judge_counts) for judge_id, judge_counts in counts.items()}
+
 @router.post("/register", response_model=JudgeResponse, status_code=status.HTTP_201_CREATED)
 def register_judge(judge: JudgeCreate, db: Session = Depends(get_db)):
     db_judge = db.query(Judge).filter(Judge.email == judge.email).first()
     if db_judge:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(judge.password)
+    hashed_password = hash_password(judge.password)
     new_judge = Judge(username=judge.username, email=judge.email, password=hashed_password)
     db.add(new_judge)
     db.commit()
     db.refresh(new_judge)
+    workload_tracker.invalidate()
     return new_judge
 
+@router.post("/register/bulk", response_model=BulkRegisterResponse)
+async def register_judges_bulk(request: Request, db: Session = Depends(get_db)):
+    """
+    Register many judges at once
+    Body: CSV (username,email,password header) or JSON array / {"accounts": [...]}
+    """
+    body = await request.body()
+    entries = await run_blocking(parse_accounts, body, request.headers.get("content-type", ""), JudgeCreate)
+    result = await run_blocking(register_accounts, db, Judge, entries, password_executor)
+    workload_tracker.invalidate()
+    return result
+
+@router.get("/analytics", response_model=List[JudgeAnalyticsSummary])
+async def get_all_judge_analytics(judge_ids: Optional[List[int]] = Query(None), db: AsyncSession = Depends(get_async_db)):
+    """Get analytics for every judge, or for the judges listed in ?judge_ids=1&judge_ids=2"""
+    async def compute():
+        stmt = select(Judge.id, Judge.username)
+        if judge_ids:
+            stmt = stmt.where(Judge.id.in_(judge_ids))
+        judges = (await db.execute(stmt.order_by(Judge.id))).all()
+        analytics = await compute_judge_analytics(db, [judge_id for judge_id, _ in judges])
+        return [
+            JudgeAnalyticsSummary(judge_id=judge_id, username=username, **analytics[judge_id].model_dump())
+            for judge_id, username in judges
+        ]
+    
+    cache_key = ("batch", tuple(sorted(set(judge_ids))) if judge_ids else None)
+    return await analytics_cache.get_or_compute_async(cache_key, compute)
+
 @router.get("/{judge_id}", response_model=JudgeResponse)
 def get_judge(judge_id: int, db: Session = Depends(get_db)):
     judge = db.query(Judge).filter(Judge.id == judge_id).first()
@@ -31,35 +100,23 @@ def get_judge(judge_id: int, db: Session = Depends(get_db)):
     return judge
 
 @router.get("/{judge_id}/analytics", response_model=JudgeAnalytics)
-def get_judge_analytics(judge_id: int, db: Session = Depends(get_db)):
+async def get_judge_analytics(judge_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get analytics for a specific judge"""
-    judge = db.query(Judge).filter(Judge.id == judge_id).first()
-    if not judge:
-        raise HTTPException(status_code=404, detail="Judge not found")
-    
-    # Calculate analytics
-    total_cases = db.query(Case).filter(Case.judge_id == judge_id).count()
-    pending_cases = db.query(Case).filter(and_(Case.judge_id == judge_id, Case.status == CaseStatus.PENDING)).count()
-    scheduled_cases = db.query(Case).filter(and_(Case.judge_id == judge_id, Case.status == CaseStatus.SCHEDULED)).count()
-    completed_cases = db.query(Case).filter(and_(Case.judge_id == judge_id, Case.status == CaseStatus.COMPLETED)).count()
-    
-    # Cases this month
-    current_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    cases_this_month = db.query(Case).filter(
-        and_(Case.judge_id == judge_id, Case.filed_at >= current_month)
-    ).count()
+    async def compute():
+        judge = await db.get(Judge, judge_id)
+        if not judge:
+            raise HTTPException(status_code=404, detail="Judge not found")
+        return (await compute_judge_analytics(db, [judge_id]))[judge_id]
     
-    return JudgeAnalytics(
-        total_cases=total_cases,
-        pending_cases=pending_cases,
-        scheduled_cases=scheduled_cases,
-        completed_cases=completed_cases,
-        cases_this_month=cases_this_month
-    )
+    return await analytics_cache.get_or_compute_async(("judge", judge_id), compute)
 
 @router.post("/schedule-hearing", response_model=ScheduleHearingResponse)
-def schedule_next_hearing(request: ScheduleHearingRequest, judge_id: int, db: Session = Depends(get_db)):
-    """Schedule next hearing for a case"""
+def schedule_next_hearing(request: ScheduleHearingRequest, judge_id: int, explain: bool = False,
+                          db: Session = Depends(get_db)):
+    """
+    Schedule next hearing for a case
+    ?explain=true adds the scheduler statistics (days scanned, queries, timings)
+    """
     # Verify case exists and is assigned to this judge
     case = db.query(Case).filter(Case.id == request.case_id).first()
     if not case:
@@ -81,7 +138,8 @@ def schedule_next_hearing(request: ScheduleHearingRequest, judge_id: int, db: Se
     return {
         "message": "Hearing scheduled successfully",
         "hearing": hearing,
-        "case": case
+        "case": case,
+        "explain": scheduler.stats.as_dict() if explain else None
     }
 
 @router.post("/close-case")
@@ -95,6 +153,7 @@ def close_case(request: CloseCaseRequest, judge_id: int, db: Session = Depends(g
         raise HTTPException(status_code=403, detail="Case not assigned to this judge")
     
     # Update case with judgment
+    previous_status = case.status
     case.status = CaseStatus.COMPLETED
     case.judgment = request.judgment
     case.judgment_date = datetime.utcnow()
@@ -102,5 +161,6 @@ def close_case(request: CloseCaseRequest, judge_id: int, db: Session = Depends(g
     
     db.commit()
     db.refresh(case)
+    workload_tracker.record_status_change(case.judge_id, previous_status, case.status)
     
     return {"message": "Case closed successfully", "case": case}
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models import User
-from app.schemas import UserCreate, UserResponse
-from app.auth import get_password_hash
+from app.schemas import UserCreate, UserResponse, BulkRegisterResponse
+from app.auth import hash_password
+from app.executors import run_blocking, password_executor
+from app.onboarding import parse_accounts, register_accounts
 
 router = APIRouter()
 
@@ -19,13 +21,23 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
     if db_username:
         raise HTTPException(status_code=400, detail="Username already taken")
     
-    hashed_password = get_password_hash(user.password)
+    hashed_password = hash_password(user.password)
     new_user = User(username=user.username, email=user.email, password=hashed_password)
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
     return new_user
 
+@router.post("/register/bulk", response_model=BulkRegisterResponse)
+async def register_users_bulk(request: Request, db: Session = Depends(get_db)):
+    """
+    Register many users at once
+    Body: CSV (username,email,password header) or JSON array / {"accounts": [...]}
+    """
+    body = await request.body()
+    entries = await run_blocking(parse_accounts, body, request.headers.get("content-type", ""), UserCreate)
+    return await run_blocking(register_accounts, db, User, entries, password_executor)
+
 @router.get("/{user_id}", response_model=UserResponse)
 def get_user(user_id: int, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.id == user_id).first()
@@ -1,9 +1,63 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, date, time, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, event, update
+from app.config import settings
+from app.database import engine
 from app.models import Case, Judge, JudgeSchedule, Hearing, CaseComplexity, CaseStatus
-from typing import Optional, Tuple, List
+from app.occupancy import JudgeOccupancyIndex, first_free_run
+from app.occupancy_matrix import OccupancyMatrix, numpy_available
+from app.workload import workload_tracker
+from app.metrics import (SCHEDULER_CASES, SCHEDULER_HEARINGS, SCHEDULER_SLOT_SEARCH, SCHEDULER_DAYS_SCANNED,
+                         SCHEDULER_QUERIES, SCHEDULER_WORK, SCHEDULER_PHASE_SECONDS)
+from typing import Optional, Tuple, List, Dict
 import random
+import time as clock
+
+class SchedulingStats:
+    """
+    Work done by one schedule_case / schedule_next_hearing call (returned by explain=true).
+    Tells calendar saturation (many days scanned), DB latency (queries) and
+    algorithmic cost (slot generation vs consecutive-slot check time) apart.
+    """
+    
+    def __init__(self, queue_level: int):
+        self.queue_level = queue_level
+        self.attempts = 0                  # slot searches (> 1 after a booking conflict)
+        self.days_scanned = 0              # weekdays whose slots were generated
+        self.weekend_days_skipped = 0
+        self.slots_generated = 0           # free slots returned by get_available_time_slots
+        self.schedule_rows_compared = 0    # JudgeSchedule rows loaded into the occupancy index
+        self.conflict_checks = 0           # database re-checks of a reserved slot
+        self.queries = 0                   # SQL statements issued during the call
+        self.slot_generation_seconds = 0.0
+        self.consecutive_check_seconds = 0.0
+        self.total_seconds = 0.0
+    
+    def as_dict(self) -> dict:
+        return {
+            "queue": f"Q{self.queue_level}",
+            "attempts": self.attempts,
+            "days_scanned": self.days_scanned,
+            "weekend_days_skipped": self.weekend_days_skipped,
+            "slots_generated": self.slots_generated,
+            "schedule_rows_compared": self.schedule_rows_compared,
+            "conflict_checks": self.conflict_checks,
+            "queries": self.queries,
+            "slot_generation_ms": round(self.slot_generation_seconds * 1000, 3),
+            "consecutive_check_ms": round(self.consecutive_check_seconds * 1000, 3),
+            "total_ms": round(self.total_seconds * 1000, 3),
+        }
+
+# Stats of the scheduling call running in the current thread/task, for query counting
+_active_stats: ContextVar[Optional[SchedulingStats]] = ContextVar("scheduling_stats", default=None)
+
+@event.listens_for(engine, "after_cursor_execute")
+def _count_scheduler_query(conn, cursor, statement, parameters, context, executemany):
+    stats = _active_stats.get()
+    if stats is not None:
+        stats.queries += 1
 
 class MultiLevelQueueScheduler:
     """
@@ -41,6 +95,9 @@ class MultiLevelQueueScheduler:
     
     SLOT_DURATION = 30  # minutes
     
+    # How far ahead to search for a free slot (in days)
+    SEARCH_HORIZON_DAYS = 90
+    
     # Duration estimates by complexity (in minutes)
     DURATION_MAP = {
         CaseComplexity.SIMPLE: 30,
@@ -59,69 +116,113 @@ class MultiLevelQueueScheduler:
     
     def __init__(self, db: Session):
         self.db = db
+        self.occupancy = occupancy_index
+        self.matrix = occupancy_matrix
+        self.workload = workload_tracker
+        # Slots reserved in the occupancy index but not committed yet
+        self._reservations: List[Tuple[int, date, time, time]] = []
+        # Queue levels of cases booked but not committed yet (counted as scheduled on commit)
+        self._uncommitted_queues: List[str] = []
+        # Stats of the current (or last) scheduling call, and per case for batches
+        self.stats: Optional[SchedulingStats] = None
+        self.stats_by_case: Dict[int, SchedulingStats] = {}
+    
+    @contextmanager
+    def _collect_stats(self, complexity: CaseComplexity):
+        """Record SchedulingStats for one scheduling call and add them to the metrics"""
+        stats = self.stats = SchedulingStats(self.get_queue_level(complexity))
+        token = _active_stats.set(stats)
+        started = clock.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.total_seconds = clock.perf_counter() - started
+            _active_stats.reset(token)
+            queue = f"Q{stats.queue_level}"
+            SCHEDULER_DAYS_SCANNED.observe(stats.days_scanned, queue=queue)
+            SCHEDULER_QUERIES.observe(stats.queries, queue=queue)
+            for kind in ("weekend_days_skipped", "slots_generated", "schedule_rows_compared", "conflict_checks"):
+                SCHEDULER_WORK.inc(getattr(stats, kind), queue=queue, kind=kind)
+            SCHEDULER_PHASE_SECONDS.inc(stats.slot_generation_seconds, queue=queue, phase="slot_generation")
+            SCHEDULER_PHASE_SECONDS.inc(stats.consecutive_check_seconds, queue=queue, phase="consecutive_check")
+    
+    def get_queue_level(self, complexity: CaseComplexity) -> int:
+        """P-MLQ queue for a complexity: 3 = complex/highly complex, 2 = moderate, 1 = simple"""
+        if complexity in [CaseComplexity.COMPLEX, CaseComplexity.HIGHLY_COMPLEX]:
+            return 3
+        elif complexity == CaseComplexity.MODERATE:
+            return 2
+        return 1
     
-    def is_break_time(self, check_time: time) -> bool:
+    @classmethod
+    def is_break_time(cls, check_time: time) -> bool:
         """Check if given time falls within any break period"""
         return (
-            (self.LUNCH_START <= check_time < self.LUNCH_END) or
-            (self.MORNING_BREAK_START <= check_time < self.MORNING_BREAK_END) or
-            (self.AFTERNOON_BREAK_START <= check_time < self.AFTERNOON_BREAK_END)
+            (cls.LUNCH_START <= check_time < cls.LUNCH_END) or
+            (cls.MORNING_BREAK_START <= check_time < cls.MORNING_BREAK_END) or
+            (cls.AFTERNOON_BREAK_START <= check_time < cls.AFTERNOON_BREAK_END)
+        )
+    
+    @classmethod
+    def _template_config(cls) -> tuple:
+        """Every constant the slot templates depend on"""
+        return (
+            cls.WORK_START_HOUR, cls.WORK_END_HOUR, cls.SLOT_DURATION,
+            cls.LUNCH_START, cls.LUNCH_END, cls.MORNING_BREAK_START, cls.MORNING_BREAK_END,
+            cls.AFTERNOON_BREAK_START, cls.AFTERNOON_BREAK_END, tuple(cls.Q1_TIME_BLOCKS)
         )
     
+    @classmethod
+    def slot_templates(cls) -> Tuple[List[Tuple[time, time]], Dict[int, int]]:
+        """
+        The workday slot grid [(start, end), ...] and, per queue level (1, 2, 3), a bitmap
+        of the grid slots that queue may use: breaks removed, and for Queue 1 only the
+        designated time blocks. Built once and rebuilt only if the constants change.
+        """
+        config = cls._template_config()
+        cached = cls.__dict__.get("_slot_templates")
+        if cached is not None and cached[0] == config:
+            return cached[1], cached[2]
+        
+        grid = []
+        minutes = cls.WORK_START_HOUR * 60
+        while minutes + cls.SLOT_DURATION <= cls.WORK_END_HOUR * 60:
+            end = minutes + cls.SLOT_DURATION
+            grid.append((time(minutes // 60, minutes % 60), time(end // 60, end % 60)))
+            minutes = end
+        
+        templates = {}
+        for queue_level in (1, 2, 3):
+            mask = 0
+            for i, (slot_start, _) in enumerate(grid):
+                if cls.is_break_time(slot_start):
+                    continue
+                if queue_level == 1 and not any(block_start <= slot_start < block_end
+                                                 for block_start, block_end in cls.Q1_TIME_BLOCKS):
+                    continue
+                mask |= 1 << i
+            templates[queue_level] = mask
+        
+        cls._slot_templates = (config, grid, templates)
+        return grid, templates
+    
+    def queue_slot_mask(self, queue_level: int = None) -> int:
+        """Bitmap of the slots a queue level may use (only Queue 1 is restricted to time blocks)"""
+        _, templates = self.slot_templates()
+        return templates[1] if queue_level == 1 else templates[3]
+    
     def get_available_time_slots(self, judge_id: int, target_date: date, 
                                  queue_level: int = None) -> List[Tuple[time, time]]:
         """
         Get available time slots for a judge on a specific date
         For Queue 1 (simple cases), only return slots in designated time blocks
         """
-        slots = []
-        current_time = datetime.combine(target_date, time(self.WORK_START_HOUR, 0))
-        end_time = datetime.combine(target_date, time(self.WORK_END_HOUR, 0))
-        
-        # Get existing schedules - NEVER modify these
-        existing_schedules = self.db.query(JudgeSchedule).filter(
-            and_(
-                JudgeSchedule.judge_id == judge_id,
-                JudgeSchedule.date == target_date
-            )
-        ).all()
+        grid, _ = self.slot_templates()
         
-        while current_time < end_time:
-            slot_end = current_time + timedelta(minutes=self.SLOT_DURATION)
-            current_time_only = current_time.time()
-            
-            # Skip all break times
-            if self.is_break_time(current_time_only):
-                current_time += timedelta(minutes=self.SLOT_DURATION)
-                continue
-            
-            # For Queue 1 (simple cases), only consider designated time blocks
-            if queue_level == 1:
-                in_time_block = False
-                for block_start, block_end in self.Q1_TIME_BLOCKS:
-                    if block_start <= current_time_only < block_end:
-                        in_time_block = True
-                        break
-                if not in_time_block:
-                    current_time += timedelta(minutes=self.SLOT_DURATION)
-                    continue
-            
-            # Check if slot conflicts with existing schedules
-            is_available = True
-            for schedule in existing_schedules:
-                schedule_start = datetime.combine(target_date, schedule.start_time)
-                schedule_end = datetime.combine(target_date, schedule.end_time)
-                
-                if not (slot_end <= schedule_start or current_time >= schedule_end):
-                    is_available = False
-                    break
-            
-            if is_available:
-                slots.append((current_time.time(), slot_end.time()))
-            
-            current_time = slot_end
+        # Queue template minus existing bookings - NEVER modify these
+        free = self.queue_slot_mask(queue_level) & ~self.occupancy.booked_mask(self.db, judge_id, target_date)
         
-        return slots
+        return [slot for i, slot in enumerate(grid) if free >> i & 1]
     
     def find_next_available_slot(self, judge_id: int, duration: int, 
                                  complexity: CaseComplexity, start_date: date = None) -> Optional[Tuple[date, time]]:
@@ -136,76 +237,219 @@ class MultiLevelQueueScheduler:
         if start_date is None:
             start_date = date.today() + timedelta(days=1)  # Start from tomorrow
         
-        # Determine queue level
-        if complexity in [CaseComplexity.COMPLEX, CaseComplexity.HIGHLY_COMPLEX]:
-            queue_level = 3  # High priority - DATE PREFERENCE
-        elif complexity == CaseComplexity.MODERATE:
-            queue_level = 2  # Medium priority - Balanced
-        else:
-            queue_level = 1  # Low priority - TIME PREFERENCE
+        # Determine queue level (3 = DATE PREFERENCE, 2 = balanced, 1 = TIME PREFERENCE)
+        queue_level = self.get_queue_level(complexity)
+        
+        stats = self.stats or SchedulingStats(queue_level)
+        stats.attempts += 1
         
-        # Search for up to 90 days
-        for day_offset in range(90):
+        # Fetch the judge's bookings for the whole search window in one range query
+        stats.schedule_rows_compared += self.occupancy.ensure_loaded(
+            self.db, judge_id, start_date, start_date + timedelta(days=self.SEARCH_HORIZON_DAYS))
+        
+        # Slots this queue may use, and how many back-to-back slots the case needs
+        allowed = self.queue_slot_mask(queue_level)
+        required_slots = (duration + self.SLOT_DURATION - 1) // self.SLOT_DURATION
+        
+        # Search for up to SEARCH_HORIZON_DAYS (90) days
+        for day_offset in range(self.SEARCH_HORIZON_DAYS):
             check_date = start_date + timedelta(days=day_offset)
             
             # Skip weekends
             if check_date.weekday() >= 5:
+                stats.weekend_days_skipped += 1
                 continue
             
-            # Get available slots based on queue level
-            available_slots = self.get_available_time_slots(judge_id, check_date, queue_level)
+            # Free slots as a bitmap: allowed for this queue and not booked
+            phase_started = clock.perf_counter()
+            free = allowed & ~self.occupancy.booked_mask(self.db, judge_id, check_date)
+            phase_ended = clock.perf_counter()
+            stats.slot_generation_seconds += phase_ended - phase_started
+            stats.days_scanned += 1
+            stats.slots_generated += bin(free).count("1")
             
-            # Find consecutive slots that can accommodate the duration
-            required_slots = (duration + self.SLOT_DURATION - 1) // self.SLOT_DURATION
+            # Earliest run of consecutive free slots that fits the duration
+            first_slot = first_free_run(free, required_slots)
+            stats.consecutive_check_seconds += clock.perf_counter() - phase_ended
+            if first_slot is not None:
+                return (check_date, self.occupancy.slot_time(first_slot))
+        
+        return None
+    
+    def lock_judge_calendar(self, judge_id: int):
+        """
+        Serialize bookings for a judge across worker processes until this transaction ends:
+        a no-op UPDATE takes the judge row's write lock (MySQL) or the database write lock
+        (SQLite), so a booking another worker has flushed but not committed is waited for
+        """
+        self.db.execute(update(Judge).where(Judge.id == judge_id).values(id=Judge.id))
+    
+    def schedule_conflicts(self, judge_id: int, target_date: date,
+                           start_time: time, end_time: time) -> List[Tuple[time, time]]:
+        """Bookings in the database overlapping [start_time, end_time) (locking read, so committed rows are seen)"""
+        return self.db.query(JudgeSchedule.start_time, JudgeSchedule.end_time).filter(
+            and_(
+                JudgeSchedule.judge_id == judge_id,
+                JudgeSchedule.date == target_date,
+                JudgeSchedule.start_time < end_time,
+                JudgeSchedule.end_time > start_time
+            )
+        ).with_for_update().all()
+    
+    def has_schedule_conflict(self, judge_id: int, target_date: date,
+                              start_time: time, end_time: time) -> bool:
+        """Check the database for a booking overlapping [start_time, end_time)"""
+        return bool(self.schedule_conflicts(judge_id, target_date, start_time, end_time))
+    
+    def reserve_next_available_slot(self, judge_id: int, duration: int, complexity: CaseComplexity,
+                                    start_date: date = None) -> Optional[Tuple[date, time, time]]:
+        """
+        Find the next available slot and reserve it in the occupancy index.
+        Before the slot is used, the judge's calendar is locked in the database and the
+        slot re-checked there, so bookings made by other worker processes - committed,
+        or still uncommitted when the index was read - are never double booked.
+        On a conflict the judge's whole window is reloaded and the search goes on.
+        Returns (date, start_time, end_time) or None.
+        """
+        # Every failed attempt marks the slot it tried as booked, so this always ends
+        for _ in range(self.SEARCH_HORIZON_DAYS * self.occupancy.num_slots):
+            slot = self.find_next_available_slot(judge_id, duration, complexity, start_date)
+            if not slot:
+                return None
+            
+            scheduled_date, scheduled_time = slot
+            end_time = (datetime.combine(scheduled_date, scheduled_time) + 
+                       timedelta(minutes=duration)).time()
             
-            for i in range(len(available_slots) - required_slots + 1):
-                # Check if we have enough consecutive slots
-                is_consecutive = True
-                for j in range(required_slots - 1):
-                    slot1_end = datetime.combine(check_date, available_slots[i + j][1])
-                    slot2_start = datetime.combine(check_date, available_slots[i + j + 1][0])
-                    if slot1_end != slot2_start:
-                        is_consecutive = False
-                        break
-                
-                if is_consecutive:
-                    return (check_date, available_slots[i][0])
+            if not self.occupancy.reserve(judge_id, scheduled_date, scheduled_time, end_time):
+                # Taken by a concurrent request in this process
+                continue
+            
+            if self.stats is not None:
+                self.stats.conflict_checks += 1
+            try:
+                self.lock_judge_calendar(judge_id)
+                conflicts = self.schedule_conflicts(judge_id, scheduled_date, scheduled_time, end_time)
+            except Exception:
+                # Lock timeout, deadlock, "database is locked": give the slot back before failing
+                self.occupancy.release(judge_id, scheduled_date, scheduled_time, end_time)
+                raise
+            if conflicts:
+                # Index was stale (another worker booked this judge) - re-read the whole window
+                self.occupancy.release(judge_id, scheduled_date, scheduled_time, end_time)
+                rows_read = self.occupancy.reload(self.db, judge_id)
+                for conflict_start, conflict_end in conflicts:
+                    self.occupancy.mark_booked(judge_id, scheduled_date, conflict_start, conflict_end)
+                if self.stats is not None:
+                    self.stats.schedule_rows_compared += rows_read
+                continue
+            
+            self._reservations.append((judge_id, scheduled_date, scheduled_time, end_time))
+            return (scheduled_date, scheduled_time, end_time)
         
         return None
     
+    def commit(self):
+        """Commit pending bookings, undoing in-memory reservations if the commit fails"""
+        try:
+            self.db.commit()
+        except Exception:
+            self.rollback()
+            raise
+        for judge_id, scheduled_date, scheduled_time, end_time in self._reservations:
+            self.occupancy.confirm(judge_id, scheduled_date, scheduled_time, end_time)
+        self._reservations.clear()
+        for queue in self._uncommitted_queues:
+            SCHEDULER_CASES.inc(queue=queue, outcome="scheduled")
+        self._uncommitted_queues.clear()
+    
+    def rollback(self):
+        """Roll back pending bookings and the in-memory state that tracked them"""
+        self.db.rollback()
+        for judge_id, scheduled_date, scheduled_time, end_time in self._reservations:
+            self.occupancy.release(judge_id, scheduled_date, scheduled_time, end_time)
+        if self._reservations:
+            self.workload.invalidate()
+        self._reservations.clear()
+        self._uncommitted_queues.clear()
+    
     def assign_judge(self) -> Optional[Judge]:
         """Assign a judge with least workload"""
-        judges = self.db.query(Judge).all()
-        if not judges:
+        # Workload counts come from one grouped query and are kept up to date in memory
+        judge_id = self.workload.least_loaded(self.db)
+        if judge_id is None:
             return None
         
-        # Simple round-robin for now, can be enhanced with workload balancing
-        judge_workload = []
-        for judge in judges:
-            active_cases = self.db.query(Case).filter(
-                and_(
-                    Case.judge_id == judge.id,
-                    Case.status.in_([CaseStatus.SCHEDULED, CaseStatus.IN_PROGRESS])
-                )
-            ).count()
-            judge_workload.append((judge, active_cases))
-        
-        # Return judge with minimum workload
-        judge_workload.sort(key=lambda x: x[1])
-        return judge_workload[0][0]
-    
-    def schedule_case(self, case: Case) -> bool:
+        judge = self.db.get(Judge, judge_id)
+        if judge is None:
+            # Judge was removed since the counts were loaded
+            self.workload.invalidate()
+            return self.assign_judge()
+        return judge
+    
+    def find_earliest_judge(self, complexity: CaseComplexity) -> Optional[Tuple[Judge, date]]:
+        """
+        Cross-judge search (CROSS_JUDGE_SEARCH): the judge who can hear the case soonest
+        and that date, searching every judge's calendar at once. Judges free at the same
+        date and time are ranked by workload. Returns None if nobody has room in the horizon.
+        """
+        counts = self.workload.get_counts(self.db)
+        queue_level = self.get_queue_level(complexity)
+        required_slots = (self.DURATION_MAP[complexity] + self.SLOT_DURATION - 1) // self.SLOT_DURATION
+        start_date = date.today() + timedelta(days=1)
+        
+        slot, rows_read = self.matrix.earliest_slot(
+            self.db, list(counts), self.queue_slot_mask(queue_level), required_slots, start_date, counts)
+        if self.stats is not None:
+            self.stats.schedule_rows_compared += rows_read
+        if slot is None:
+            return None
+        
+        judge_id, slot_date, _ = slot
+        judge = self.db.get(Judge, judge_id)
+        if judge is None:
+            # Judge was removed since the counts were loaded
+            self.workload.invalidate()
+            self.occupancy.invalidate(judge_id)
+            return self.find_earliest_judge(complexity)
+        return judge, slot_date
+    
+    def schedule_case(self, case: Case, commit: bool = True) -> bool:
         """
         Schedule a case using P-MLQ algorithm
         Implements bi-preferential scheduling without rescheduling existing cases
+        With commit=False the booking is only flushed; the caller commits (see schedule_cases)
+        The work done is left in self.stats (and self.stats_by_case[case.id])
         """
+        with self._collect_stats(case.complexity) as stats:
+            self.stats_by_case[case.id] = stats
+            return self._schedule_case(case, commit)
+    
+    def _schedule_case(self, case: Case, commit: bool) -> bool:
+        previous_status = case.status
+        previous_judge_id = case.judge_id
+        queue = f"Q{self.get_queue_level(case.complexity)}"
+        
         # Assign priority score based on complexity
         case.priority_score = self.PRIORITY_MAP[case.complexity]
         
         # Assign judge if not already assigned
-        if not case.judge_id:
+        start_date = None
+        if not case.judge_id and settings.CROSS_JUDGE_SEARCH and self.matrix is not None:
+            if not self.workload.get_counts(self.db):
+                SCHEDULER_CASES.inc(queue=queue, outcome="no_judge")
+                return False
+            # Whoever can hear it soonest; the slot search below starts from that date
+            choice = self.find_earliest_judge(case.complexity)
+            if not choice:
+                SCHEDULER_CASES.inc(queue=queue, outcome="no_slot")
+                return False
+            judge, start_date = choice
+            case.judge_id = judge.id
+        elif not case.judge_id:
             judge = self.assign_judge()
             if not judge:
+                SCHEDULER_CASES.inc(queue=queue, outcome="no_judge")
                 return False
             case.judge_id = judge.id
         
@@ -215,12 +459,16 @@ class MultiLevelQueueScheduler:
         
         # Find available slot using P-MLQ policy
         # CRITICAL: This will NEVER reschedule existing cases
-        slot = self.find_next_available_slot(case.judge_id, duration, case.complexity)
+        search_started = clock.perf_counter()
+        slot = self.reserve_next_available_slot(case.judge_id, duration, case.complexity, start_date)
+        SCHEDULER_SLOT_SEARCH.observe(clock.perf_counter() - search_started, queue=queue)
         if not slot:
-            # If no slot found, case remains pending
+            # If no slot found, case remains pending (and unassigned)
+            case.judge_id = previous_judge_id
+            SCHEDULER_CASES.inc(queue=queue, outcome="no_slot")
             return False
         
-        scheduled_date, scheduled_time = slot
+        scheduled_date, scheduled_time, end_time = slot
         
         # Update case status
         case.scheduled_date = scheduled_date
@@ -228,9 +476,6 @@ class MultiLevelQueueScheduler:
         case.status = CaseStatus.SCHEDULED
         
         # Create judge schedule entry (blocking this time slot)
-        end_time = (datetime.combine(scheduled_date, scheduled_time) + 
-                   timedelta(minutes=duration)).time()
-        
         judge_schedule = JudgeSchedule(
             judge_id=case.judge_id,
             date=scheduled_date,
@@ -238,19 +483,54 @@ class MultiLevelQueueScheduler:
             end_time=end_time,
             is_available=False,
             case_id=case.id,
-            notes=f"Q{3 if case.complexity in [CaseComplexity.COMPLEX, CaseComplexity.HIGHLY_COMPLEX] else (2 if case.complexity == CaseComplexity.MODERATE else 1)} - {case.case_number}"
+            notes=f"{queue} - {case.case_number}"
         )
         
         self.db.add(judge_schedule)
-        self.db.commit()
+        self._uncommitted_queues.append(queue)
+        if commit:
+            self.commit()
+        else:
+            self.db.flush()
         
+        self.workload.record_status_change(case.judge_id, previous_status, CaseStatus.SCHEDULED)
         return True
     
+    def schedule_cases(self, cases: List[Case], chunk_size: int = 200) -> Dict[int, bool]:
+        """
+        Schedule a batch of cases in P-MLQ queue order:
+        complex/highly complex first, then moderate, then simple (FCFS within a queue).
+        Commits once per chunk; a failed chunk is rolled back and its cases stay pending.
+        Returns {case_id: scheduled}
+        """
+        # sorted() is stable, so arrival order is kept within each queue
+        ordered = sorted(cases, key=lambda c: self.get_queue_level(c.complexity), reverse=True)
+        
+        results = {}
+        for start in range(0, len(ordered), chunk_size):
+            chunk = ordered[start:start + chunk_size]
+            case_ids = [case.id for case in chunk]
+            try:
+                chunk_results = {case.id: self.schedule_case(case, commit=False) for case in chunk}
+                self.commit()
+            except Exception as e:
+                print(f"Batch scheduling error: {e}")
+                self.rollback()
+                chunk_results = {case_id: False for case_id in case_ids}
+            results.update(chunk_results)
+        
+        return results
+    
     def schedule_next_hearing(self, case: Case) -> Optional[Hearing]:
         """
         Schedule next hearing for a case using P-MLQ algorithm
         Hearings are scheduled at least 7 days from today
+        The work done is left in self.stats
         """
+        with self._collect_stats(case.complexity):
+            return self._schedule_next_hearing(case)
+    
+    def _schedule_next_hearing(self, case: Case) -> Optional[Hearing]:
         if not case.judge_id:
             return None
         
@@ -266,11 +546,15 @@ class MultiLevelQueueScheduler:
         start_date = date.today() + timedelta(days=7)
         
         # Use P-MLQ algorithm to find slot
-        slot = self.find_next_available_slot(case.judge_id, duration, case.complexity, start_date)
+        queue = f"Q{self.get_queue_level(case.complexity)}"
+        search_started = clock.perf_counter()
+        slot = self.reserve_next_available_slot(case.judge_id, duration, case.complexity, start_date)
+        SCHEDULER_SLOT_SEARCH.observe(clock.perf_counter() - search_started, queue=queue)
         if not slot:
+            SCHEDULER_HEARINGS.inc(queue=queue, outcome="no_slot")
             return None
         
-        scheduled_date, scheduled_time = slot
+        scheduled_date, scheduled_time, end_time = slot
         
         # Create hearing record
         hearing = Hearing(
@@ -283,9 +567,6 @@ class MultiLevelQueueScheduler:
         )
         
         # Create judge schedule entry
-        end_time = (datetime.combine(scheduled_date, scheduled_time) + 
-                   timedelta(minutes=duration)).time()
-        
         judge_schedule = JudgeSchedule(
             judge_id=case.judge_id,
             date=scheduled_date,
@@ -298,7 +579,27 @@ class MultiLevelQueueScheduler:
         
         self.db.add(hearing)
         self.db.add(judge_schedule)
-        self.db.commit()
+        self.commit()
         self.db.refresh(hearing)
+        SCHEDULER_HEARINGS.inc(queue=queue, outcome="scheduled")
         
         return hearing
+
+
+# Build the per-queue slot templates once at import
+MultiLevelQueueScheduler.slot_templates()
+
+# Shared across requests so each judge's calendar is loaded from the database only once
+occupancy_index = JudgeOccupancyIndex(
+    MultiLevelQueueScheduler.WORK_START_HOUR,
+    MultiLevelQueueScheduler.WORK_END_HOUR,
+    MultiLevelQueueScheduler.SLOT_DURATION
+)
+
+# Cross-judge view of the same bitmaps, used when CROSS_JUDGE_SEARCH is on
+occupancy_matrix = (
+    OccupancyMatrix(occupancy_index, MultiLevelQueueScheduler.SEARCH_HORIZON_DAYS)
+    if numpy_available() else None
+)
+if settings.CROSS_JUDGE_SEARCH and occupancy_matrix is None:
+    print("Warning: CROSS_JUDGE_SEARCH needs numpy; assigning the least-loaded judge instead")
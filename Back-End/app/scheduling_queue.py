@@ -0,0 +1,280 @@
+"""
+Background scheduling queue
+
+file_case stores a case as PENDING and hands its id to this queue instead of
+running the P-MLQ search inside the request. A single worker thread drains
+the queue, coalescing everything that is waiting into one batch that is
+scheduled in queue priority order (see MultiLevelQueueScheduler.schedule_cases).
+
+With several worker processes, a case is only scheduled by the process that
+claimed it: claiming inserts a SchedulingClaim row, whose primary key lets
+exactly one process win. The claim is removed after the scheduling attempt.
+Each worker refreshes claimed_at on its claims periodically; claims not
+refreshed within the claim timeout belong to a worker that died and are
+taken over by the others (in the same sweep, or by submit()).
+"""
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Set
+from sqlalchemy import literal, select, exists, update
+from sqlalchemy.exc import IntegrityError
+from app.config import settings
+from app.database import SessionLocal
+from app.metrics import SCHEDULING_BACKLOG
+from app.models import Case, CaseStatus, SchedulingClaim
+from app.scheduler import MultiLevelQueueScheduler
+
+
+class BackgroundSchedulingQueue:
+    """Bounded queue of case ids plus the worker thread that schedules them"""
+
+    def __init__(self, maxsize: int = 1000, batch_size: int = 100, claim_timeout_seconds: int = 600):
+        self.batch_size = batch_size
+        self.claim_timeout_seconds = claim_timeout_seconds
+        # Claims are refreshed (and dead workers' claims taken over) this often
+        self.sweep_interval_seconds = max(1, claim_timeout_seconds // 3)
+        # Identifies this process's claims
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._queue: "queue.Queue[int]" = queue.Queue(maxsize)
+        self._queued: Set[int] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="case-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, case_id: int) -> bool:
+        """
+        Claim a case and queue it for scheduling (blocking - call from a worker thread).
+        Returns False if the worker is not running or the queue is full,
+        in which case the caller should schedule the case itself.
+        A case claimed by another live process counts as queued; an expired claim
+        (its worker died) is taken over.
+        """
+        if not self.running or self._queue.full():
+            return False
+        with self._lock:
+            if case_id in self._queued:
+                return True
+        if not self._claim(case_id):
+            return True
+        if not self._put(case_id):
+            self._release([case_id])
+            return False
+        return True
+
+    def _put(self, case_id: int) -> bool:
+        with self._lock:
+            if case_id in self._queued:
+                return True
+            try:
+                self._queue.put_nowait(case_id)
+            except queue.Full:
+                return False
+            self._queued.add(case_id)
+        return True
+
+    def _claim_expiry(self) -> datetime:
+        """Claims not refreshed since this time belong to a dead worker"""
+        return datetime.utcnow() - timedelta(seconds=self.claim_timeout_seconds)
+
+    def claim_is_live(self, claim: SchedulingClaim) -> bool:
+        """Whether a claim's worker refreshed it within the claim timeout"""
+        return claim.claimed_at >= self._claim_expiry()
+
+    def _claim(self, case_id: int) -> bool:
+        """Claim a case for this process; False if another live process holds it"""
+        db = SessionLocal()
+        try:
+            db.add(SchedulingClaim(case_id=case_id, owner=self.owner, claimed_at=datetime.utcnow()))
+            db.commit()
+            return True
+        except IntegrityError:
+            db.rollback()
+            # Take the claim over only if it has expired; the condition makes one taker win
+            taken = db.execute(update(SchedulingClaim).where(
+                SchedulingClaim.case_id == case_id,
+                SchedulingClaim.claimed_at < self._claim_expiry()
+            ).values(owner=self.owner, claimed_at=datetime.utcnow())).rowcount
+            db.commit()
+            return taken == 1
+        finally:
+            db.close()
+
+    def _release(self, case_ids: List[int]):
+        """Drop this process's claims once the scheduling attempt is over"""
+        db = SessionLocal()
+        try:
+            db.query(SchedulingClaim).filter(
+                SchedulingClaim.case_id.in_(case_ids),
+                SchedulingClaim.owner == self.owner
+            ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def backlog(self) -> int:
+        """Number of cases waiting to be scheduled"""
+        return self._queue.qsize()
+
+    def enqueue_pending(self):
+        """
+        Queue cases left PENDING by a previous run (e.g. after a restart).
+        Claims older than the claim timeout (crashed workers) are taken over, then the
+        unclaimed backlog is claimed with a single INSERT ... SELECT. When several
+        workers start together, one of them claims the backlog; the statements of
+        the others find nothing left or fail on the primary key and back off.
+        """
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            db.query(SchedulingClaim).filter(
+                SchedulingClaim.claimed_at < now - timedelta(seconds=self.claim_timeout_seconds)
+            ).delete(synchronize_session=False)
+            unclaimed = select(Case.id, literal(self.owner), literal(now)).where(
+                Case.status == CaseStatus.PENDING,
+                ~exists().where(SchedulingClaim.case_id == Case.id)
+            ).order_by(Case.filed_at, Case.id).limit(self._queue.maxsize - self._queue.qsize())
+            db.execute(SchedulingClaim.__table__.insert().from_select(
+                ["case_id", "owner", "claimed_at"], unclaimed))
+            db.commit()
+            
+            case_ids = [row[0] for row in db.query(SchedulingClaim.case_id).join(
+                Case, Case.id == SchedulingClaim.case_id
+            ).filter(SchedulingClaim.owner == self.owner).order_by(Case.filed_at, Case.id).all()]
+        except IntegrityError:
+            # Another worker claimed the backlog at the same time
+            db.rollback()
+            return
+        finally:
+            db.close()
+        
+        for i, case_id in enumerate(case_ids):
+            if not self._put(case_id):
+                self._release(case_ids[i:])
+                break
+
+    def sweep_claims(self):
+        """
+        Refresh this process's claims, then take over expired claims on pending cases
+        (their worker died) and queue them. Expired claims on cases that are no longer
+        pending are dropped.
+        """
+        now = datetime.utcnow()
+        expiry = self._claim_expiry()
+        db = SessionLocal()
+        try:
+            db.execute(update(SchedulingClaim).where(
+                SchedulingClaim.owner == self.owner
+            ).values(claimed_at=now))
+            db.query(SchedulingClaim).filter(
+                SchedulingClaim.claimed_at < expiry,
+                ~exists().where(Case.id == SchedulingClaim.case_id, Case.status == CaseStatus.PENDING)
+            ).delete(synchronize_session=False)
+            expired = [row[0] for row in db.query(SchedulingClaim.case_id).filter(
+                SchedulingClaim.claimed_at < expiry
+            ).limit(self._queue.maxsize - self._queue.qsize()).all()]
+            if expired:
+                # Conditional update: when several workers sweep at once each claim moves once
+                db.execute(update(SchedulingClaim).where(
+                    SchedulingClaim.case_id.in_(expired),
+                    SchedulingClaim.claimed_at < expiry
+                ).values(owner=self.owner, claimed_at=now))
+            db.commit()
+            case_ids = [row[0] for row in db.query(SchedulingClaim.case_id).join(
+                Case, Case.id == SchedulingClaim.case_id
+            ).filter(
+                SchedulingClaim.case_id.in_(expired),
+                SchedulingClaim.owner == self.owner
+            ).order_by(Case.filed_at, Case.id).all()] if expired else []
+        finally:
+            db.close()
+
+        for i, case_id in enumerate(case_ids):
+            if not self._put(case_id):
+                self._release(case_ids[i:])
+                break
+
+    def _next_batch(self) -> List[int]:
+        """Block until work arrives, then take everything waiting (up to batch_size)"""
+        try:
+            case_ids = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        while len(case_ids) < self.batch_size:
+            try:
+                case_ids.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return case_ids
+
+    def _run(self):
+        last_sweep = time.monotonic()
+        while not self._stop.is_set():
+            if time.monotonic() - last_sweep >= self.sweep_interval_seconds:
+                last_sweep = time.monotonic()
+                try:
+                    self.sweep_claims()
+                except Exception as e:
+                    print(f"Background scheduling error: could not sweep claims: {e}")
+            case_ids = self._next_batch()
+            if not case_ids:
+                continue
+            try:
+                self._schedule(case_ids)
+            except Exception as e:
+                print(f"Background scheduling error: {e}")
+            finally:
+                with self._lock:
+                    self._queued.difference_update(case_ids)
+                try:
+                    self._release(case_ids)
+                except Exception as e:
+                    print(f"Background scheduling error: could not release claims: {e}")
+
+    def _schedule(self, case_ids: List[int]):
+        db = SessionLocal()
+        try:
+            # Only cases this process still holds a claim on (a claim can be taken
+            # over after the timeout) and that are still pending
+            cases = db.query(Case).join(SchedulingClaim, SchedulingClaim.case_id == Case.id).filter(
+                Case.id.in_(case_ids),
+                SchedulingClaim.owner == self.owner,
+                Case.status == CaseStatus.PENDING
+            ).order_by(Case.filed_at, Case.id).all()
+            if not cases:
+                return
+            results = MultiLevelQueueScheduler(db).schedule_cases(cases)
+            unscheduled = sum(1 for scheduled in results.values() if not scheduled)
+            if unscheduled:
+                print(f"Warning: {unscheduled} case(s) filed but not scheduled")
+        finally:
+            db.close()
+
+
+scheduling_queue = BackgroundSchedulingQueue(
+    maxsize=settings.SCHEDULING_QUEUE_SIZE,
+    batch_size=settings.SCHEDULING_BATCH_SIZE,
+    claim_timeout_seconds=settings.SCHEDULING_CLAIM_TIMEOUT_SECONDS
+)
+SCHEDULING_BACKLOG.set_function(scheduling_queue.backlog)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime, date, time
 from typing import Optional, List
 from enum import Enum
@@ -96,6 +96,89 @@ class CaseResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class CaseSummary(BaseModel):
+    """Case fields shown in list views (no description, sections or judgment text)"""
+    id: int
+    case_number: str
+    title: str
+    complexity: CaseComplexity
+    status: CaseStatus
+    priority_score: int
+    user_id: int
+    judge_id: Optional[int]
+    filed_at: datetime
+    scheduled_date: Optional[date]
+    scheduled_time: Optional[time]
+    estimated_duration: Optional[int]
+    
+    class Config:
+        from_attributes = True
+
+class BulkCaseItem(BaseModel):
+    title: str = Field(max_length=200)
+    description: str
+    sections: str
+    user_id: int
+    case_number: Optional[str] = Field(default=None, max_length=50)  # Keep the number assigned by the transferring court
+
+class SchedulingExplain(BaseModel):
+    """Work done by one scheduler call (returned with explain=true)"""
+    queue: str  # Q1, Q2 or Q3
+    attempts: int
+    days_scanned: int
+    weekend_days_skipped: int
+    slots_generated: int
+    schedule_rows_compared: int
+    conflict_checks: int
+    queries: int
+    slot_generation_ms: float  # building the free-slot bitmaps
+    consecutive_check_ms: float
+    total_ms: float
+
+class FiledCaseResponse(CaseResponse):
+    explain: Optional[SchedulingExplain] = None  # Only with explain=true (the case is then scheduled inline)
+
+class BulkCaseResult(BaseModel):
+    index: int  # Position of the case in the submitted batch
+    case_id: Optional[int] = None
+    case_number: Optional[str] = None
+    complexity: Optional[CaseComplexity] = None
+    status: str  # scheduled, pending or error
+    judge_id: Optional[int] = None
+    scheduled_date: Optional[date] = None
+    scheduled_time: Optional[time] = None
+    error: Optional[str] = None
+    explain: Optional[SchedulingExplain] = None
+
+class BulkFileResponse(BaseModel):
+    total: int
+    scheduled: int
+    pending: int
+    failed: int
+    results: List[BulkCaseResult]
+
+class BulkAccountResult(BaseModel):
+    index: int  # Position of the account in the submitted batch
+    id: Optional[int] = None
+    username: Optional[str] = None
+    email: Optional[str] = None
+    status: str  # created or error
+    error: Optional[str] = None
+
+class BulkRegisterResponse(BaseModel):
+    total: int
+    created: int
+    failed: int
+    results: List[BulkAccountResult]
+
+class SchedulingStatusResponse(BaseModel):
+    case_id: int
+    status: CaseStatus
+    queued: bool  # Waiting for the background scheduler
+    judge_id: Optional[int]
+    scheduled_date: Optional[date]
+    scheduled_time: Optional[time]
+
 class CaseUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -114,6 +197,10 @@ class JudgeAnalytics(BaseModel):
     completed_cases: int
     cases_this_month: int
 
+class JudgeAnalyticsSummary(JudgeAnalytics):
+    judge_id: int
+    username: str
+
 class AdminAnalytics(BaseModel):
     total_cases: int
     total_users: int
@@ -143,3 +230,4 @@ class ScheduleHearingResponse(BaseModel):
     message: str
     hearing: HearingResponse
     case: CaseResponse
+    explain: Optional[SchedulingExplain] = None
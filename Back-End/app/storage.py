@@ -0,0 +1,126 @@
+"""
+Content-addressed document storage for case uploads
+
+Uploads are hashed (SHA-256) in fixed-size chunks, never read into memory in
+full, and stored under that hash in a sharded layout: uploads/ab/cd/abcd1234...
+Identical documents attached to many cases are stored once, and a duplicate is
+not written at all; the reference count of a stored file is the number of
+cases whose document_path points at it.
+"""
+import hashlib
+import os
+import shutil
+import uuid
+from fastapi import UploadFile
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.executors import run_blocking
+from app.models import Case
+
+UPLOAD_DIR = "uploads"
+TEMP_DIR = os.path.join(UPLOAD_DIR, "tmp")
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+os.makedirs(TEMP_DIR, exist_ok=True)
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds MAX_UPLOAD_SIZE_MB"""
+    pass
+
+
+def content_path(digest: str) -> str:
+    """Sharded location of a stored file, two directory levels deep"""
+    return os.path.join(UPLOAD_DIR, digest[:2], digest[2:4], digest)
+
+
+def _hash_file(f, max_bytes: int) -> str:
+    """SHA-256 of a file object read in chunks from the start, enforcing the size limit"""
+    f.seek(0)
+    sha256 = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = f.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLargeError(f"File exceeds {settings.MAX_UPLOAD_SIZE_MB} MB limit")
+        sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _copy_into_store(f, digest: str) -> str:
+    """Copy a file object to its content path, unless that content is already stored"""
+    final_path = content_path(digest)
+    if os.path.exists(final_path):
+        # Duplicate upload - keep the stored copy, nothing is written
+        return final_path
+
+    temp_path = os.path.join(TEMP_DIR, f"{uuid.uuid4()}.part")
+    try:
+        f.seek(0)
+        with open(temp_path, 'wb') as out:
+            shutil.copyfileobj(f, out, CHUNK_SIZE)
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(temp_path, final_path)
+    except BaseException:
+        # Never leave partial files behind
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return final_path
+
+
+async def save_upload(upload: UploadFile) -> str:
+    """
+    Store an uploaded file and return its path.
+    The upload is already spooled by the form parser, so it is hashed first and
+    only copied into the store when that content is not stored yet.
+    Hashing and disk I/O run on the blocking executor.
+    """
+    max_bytes = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+    digest = await run_blocking(_hash_file, upload.file, max_bytes)
+    return await run_blocking(_copy_into_store, upload.file, digest)
+
+
+async def restore_upload(upload: UploadFile, document_path: str):
+    """
+    Call after committing the case that refers to document_path: if release_document
+    removed the stored copy while the case was being saved (it counted no references
+    yet), write it back from the upload.
+    """
+    if not os.path.exists(document_path):
+        await run_blocking(_copy_into_store, upload.file, os.path.basename(document_path))
+
+
+def reference_count(db: Session, document_path: str) -> int:
+    """Number of cases that point at a stored file"""
+    return db.query(Case).filter(Case.document_path == document_path).count()
+
+
+def release_document(db: Session, document_path: str):
+    """Delete a stored file once no case refers to it any more (call after commit)"""
+    if not document_path:
+        return
+    # Only ever delete files inside the upload store
+    upload_root = os.path.abspath(UPLOAD_DIR)
+    if os.path.commonpath([upload_root, os.path.abspath(document_path)]) != upload_root:
+        return
+    if reference_count(db, document_path) > 0 or not os.path.exists(document_path):
+        return
+
+    # Move the file aside, then count again: a case committed in the meantime (a
+    # duplicate upload that found the file) gets it back. An upload that checks
+    # after its commit and finds the file gone restores it (see restore_upload).
+    doomed_path = f"{document_path}.{uuid.uuid4().hex}.deleting"
+    try:
+        os.replace(document_path, doomed_path)
+        # New transaction, so the count sees cases committed since the first one
+        db.commit()
+        if reference_count(db, document_path) > 0:
+            os.replace(doomed_path, document_path)
+        else:
+            os.remove(doomed_path)
+    except OSError as e:
+        print(f"Could not remove document {document_path}: {e}")
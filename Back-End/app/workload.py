@@ -0,0 +1,81 @@
+"""
+Incrementally maintained judge workload counters
+
+Workload = number of SCHEDULED / IN_PROGRESS cases assigned to a judge.
+Counts are loaded with one grouped aggregate and then adjusted in memory as
+cases are scheduled, closed, edited or deleted. They are re-read periodically
+so counters kept by other worker processes do not drift apart for long.
+"""
+import threading
+import time
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import func, and_
+from app.models import Case, Judge, CaseStatus
+
+ACTIVE_STATUSES = (CaseStatus.SCHEDULED, CaseStatus.IN_PROGRESS)
+
+
+class JudgeWorkloadTracker:
+    """Active case count per judge, shared by all scheduler instances"""
+
+    def __init__(self, refresh_seconds: int = 60):
+        self.refresh_seconds = refresh_seconds
+        self._counts: Optional[Dict[int, int]] = None
+        self._loaded_at = 0.0
+        self._lock = threading.RLock()
+
+    def _load(self, db: Session):
+        """Load every judge's active case count in a single query"""
+        rows = db.query(Judge.id, func.count(Case.id)).outerjoin(
+            Case,
+            and_(
+                Case.judge_id == Judge.id,
+                Case.status.in_(ACTIVE_STATUSES)
+            )
+        ).group_by(Judge.id).all()
+
+        self._counts = {judge_id: count for judge_id, count in rows}
+        self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self, db: Session):
+        if self._counts is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+            self._load(db)
+
+    def get_counts(self, db: Session) -> Dict[int, int]:
+        """Snapshot of active case counts keyed by judge id"""
+        with self._lock:
+            self._ensure_loaded(db)
+            return dict(self._counts)
+
+    def least_loaded(self, db: Session) -> Optional[int]:
+        """Id of the judge with the fewest active cases (lowest id wins ties)"""
+        with self._lock:
+            self._ensure_loaded(db)
+            if not self._counts:
+                return None
+            return min(self._counts, key=lambda judge_id: (self._counts[judge_id], judge_id))
+
+    def adjust(self, judge_id: Optional[int], delta: int):
+        """Add `delta` to a judge's active case count"""
+        if judge_id is None:
+            return
+        with self._lock:
+            if self._counts is not None and judge_id in self._counts:
+                self._counts[judge_id] = max(0, self._counts[judge_id] + delta)
+
+    def record_status_change(self, judge_id: Optional[int], old_status: Optional[CaseStatus],
+                             new_status: Optional[CaseStatus]):
+        """Adjust counters for a case moving between statuses (None = case created/deleted)"""
+        was_active = old_status in ACTIVE_STATUSES
+        is_active = new_status in ACTIVE_STATUSES
+        if was_active != is_active:
+            self.adjust(judge_id, 1 if is_active else -1)
+
+    def invalidate(self):
+        """Force a reload on next use (e.g. after judges are added or removed)"""
+        with self._lock:
+            self._counts = None
+
+
+workload_tracker = JudgeWorkloadTracker()
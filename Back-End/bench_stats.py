@@ -0,0 +1,13 @@
+"""
+Summary statistics shared by the benchmark scripts (benchmark_scheduler.py, load_test.py)
+"""
+import math
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile: the smallest value with at least pct% of the values at or below it"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
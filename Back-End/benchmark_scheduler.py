@@ -0,0 +1,229 @@
+"""
+Benchmark for the P-MLQ scheduler on a synthetic workload
+
+Seeds a throwaway database (in-memory SQLite by default) with judges, existing
+bookings and a mix of pending cases, then drives schedule_case and
+schedule_next_hearing and reports throughput, p50/p99 latency, SQL statements
+per call, days scanned per call, how many days out cases land and the time split between generating free
+slots and checking for consecutive slots (from the scheduler's own statistics).
+
+Usage:
+    cd Back-End
+    python benchmark_scheduler.py
+    python benchmark_scheduler.py --judges 50 --cases 5000 --bookings 80 --mix simple=50,moderate=30,complex=20
+    python benchmark_scheduler.py --db sqlite:///bench.db --json > baseline.json
+    python benchmark_scheduler.py --judges 200 --cross-judge
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, time as clock_time, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = "simple=40,moderate=30,complex=20,highly_complex=10"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark MultiLevelQueueScheduler on a synthetic workload")
+    parser.add_argument("--db", default="sqlite:///:memory:", help="Database URL (use a scratch database!)")
+    parser.add_argument("--judges", type=int, default=20)
+    parser.add_argument("--cases", type=int, default=2000, help="Pending cases to schedule")
+    parser.add_argument("--bookings", type=int, default=40, help="Existing bookings per judge")
+    parser.add_argument("--booking-days", type=int, default=60, help="Existing bookings are spread over this many days")
+    parser.add_argument("--hearings", type=int, default=200, help="schedule_next_hearing calls")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Complexity mix as name=weight pairs")
+    parser.add_argument("--cold", action="store_true", help="Clear the occupancy index before every call")
+    parser.add_argument("--cross-judge", action="store_true",
+                        help="Assign judges with the cross-judge earliest-slot search (CROSS_JUDGE_SEARCH, needs numpy)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args()
+
+args = parse_args()
+
+# Settings are read at import time, so point the app at the scratch database first
+os.environ["DATABASE_URL"] = args.db
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["CROSS_JUDGE_SEARCH"] = "true" if args.cross_judge else "false"
+
+from app.database import SessionLocal, engine
+from app.models import Base, User, Judge, Case, JudgeSchedule, CaseComplexity, CaseStatus
+from app.scheduler import MultiLevelQueueScheduler, occupancy_index
+from app.workload import workload_tracker
+from bench_stats import percentile
+
+def parse_mix(mix: str):
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[CaseComplexity(name.strip())] = float(weight)
+    return weights
+
+def seed(db, rng: random.Random, weights):
+    """Create one filing user, the judges, their existing bookings and the pending cases"""
+    user = User(username="bench_user", email="bench_user@example.com", password="x")
+    judges = [Judge(username=f"bench_judge_{i}", email=f"bench_judge_{i}@example.com", password="x")
+              for i in range(args.judges)]
+    db.add(user)
+    db.add_all(judges)
+    db.commit()
+
+    # Existing bookings: random free 30/60-minute blocks on weekdays in the booking window
+    slot = MultiLevelQueueScheduler.SLOT_DURATION
+    day_minutes = (MultiLevelQueueScheduler.WORK_END_HOUR - MultiLevelQueueScheduler.WORK_START_HOUR) * 60
+    first_day = date.today() + timedelta(days=1)
+    bookings = []
+    for judge in judges:
+        taken = set()
+        for _ in range(args.bookings * 3):
+            if len(taken) >= args.bookings:
+                break
+            day = first_day + timedelta(days=rng.randrange(args.booking_days))
+            if day.weekday() >= 5:
+                continue
+            start_slot = rng.randrange(day_minutes // slot - 1)
+            length = rng.choice((1, 2))
+            if any((day, start_slot + k) in taken for k in range(length)):
+                continue
+            taken.update((day, start_slot + k) for k in range(length))
+            start = MultiLevelQueueScheduler.WORK_START_HOUR * 60 + start_slot * slot
+            end = start + length * slot
+            bookings.append(JudgeSchedule(
+                judge_id=judge.id, date=day,
+                start_time=time_of(start), end_time=time_of(end),
+                is_available=False, notes="benchmark booking"
+            ))
+    db.add_all(bookings)
+
+    complexities = list(weights)
+    cases = [
+        Case(case_number=f"BENCH-{i:06d}", title="Benchmark case", description="Synthetic",
+             sections="", complexity=rng.choices(complexities, [weights[c] for c in complexities])[0],
+             user_id=user.id, status=CaseStatus.PENDING)
+        for i in range(args.cases)
+    ]
+    db.add_all(cases)
+    db.commit()
+    return [(case.id, case.complexity) for case in cases], len(bookings)
+
+def time_of(minutes: int) -> clock_time:
+    return clock_time(minutes // 60, minutes % 60)
+
+def summarize(samples):
+    latencies = [s["seconds"] for s in samples]
+    leads = [s["lead_days"] for s in samples if s["lead_days"] is not None]
+    total = sum(latencies)
+    return {
+        "calls": len(samples),
+        "succeeded": sum(1 for s in samples if s["ok"]),
+        "throughput_per_s": round(len(samples) / total, 1) if total else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(max(latencies, default=0) * 1000, 3),
+        "queries_per_call": round(statistics.mean(s["queries"] for s in samples), 2) if samples else 0.0,
+        "days_scanned_per_call": round(statistics.mean(s["days"] for s in samples), 2) if samples else 0.0,
+        "lead_days": round(statistics.mean(leads), 2) if leads else 0.0,
+        "slot_generation_ms": round(sum(s["slot_generation_ms"] for s in samples), 1),
+        "consecutive_check_ms": round(sum(s["consecutive_check_ms"] for s in samples), 1),
+    }
+
+def measure(case_id, call):
+    """
+    Run call(scheduler, case) once in a fresh session, like a request would
+    (call returns what was scheduled - the case or hearing - or None),
+    and record latency plus the scheduler's statistics (loading the case is not timed)
+    """
+    if args.cold:
+        occupancy_index.invalidate()
+    db = SessionLocal()
+    try:
+        case = db.get(Case, case_id)
+        scheduler = MultiLevelQueueScheduler(db)
+        start = time.perf_counter()
+        result = call(scheduler, case)
+        elapsed = time.perf_counter() - start
+        stats = scheduler.stats.as_dict()
+        scheduled_date = result.scheduled_date if result else None
+        return {
+            "ok": bool(result),
+            "seconds": elapsed,
+            "queries": stats["queries"],
+            "days": stats["days_scanned"],
+            "slot_generation_ms": stats["slot_generation_ms"],
+            "consecutive_check_ms": stats["consecutive_check_ms"],
+            "lead_days": (scheduled_date - date.today()).days if scheduled_date else None,
+        }
+    finally:
+        db.close()
+
+def run():
+    rng = random.Random(args.seed)
+    weights = parse_mix(args.mix)
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        cases, booking_count = seed(db, rng, weights)
+    finally:
+        db.close()
+
+    # Start from a cold process: nothing cached from seeding
+    occupancy_index.invalidate()
+    workload_tracker.invalidate()
+    by_complexity = {}
+    case_samples = []
+    scheduled = []
+    for case_id, complexity in cases:
+        sample = measure(case_id, lambda s, case: case if s.schedule_case(case) else None)
+        case_samples.append(sample)
+        by_complexity.setdefault(complexity.value, []).append(sample)
+        if sample["ok"]:
+            scheduled.append(case_id)
+
+    hearing_samples = [
+        measure(case_id, lambda s, case: s.schedule_next_hearing(case))
+        for case_id in rng.sample(scheduled, min(args.hearings, len(scheduled)))
+    ]
+
+    report = {
+        "workload": {
+            "judges": args.judges, "cases": args.cases, "existing_bookings": booking_count,
+            "mix": args.mix, "cold_index": args.cold, "cross_judge": args.cross_judge,
+            "database": engine.dialect.name,
+        },
+        "schedule_case": summarize(case_samples),
+        "schedule_case_by_complexity": {name: summarize(samples) for name, samples in sorted(by_complexity.items())},
+        "schedule_next_hearing": summarize(hearing_samples),
+    }
+    return report
+
+def print_report(report):
+    workload = report["workload"]
+    print("P-MLQ scheduler benchmark")
+    print(f"  {workload['judges']} judges, {workload['existing_bookings']} existing bookings, "
+          f"{workload['cases']} cases ({workload['mix']}), {workload['database']}"
+          f"{', cold index' if workload['cold_index'] else ''}"
+          f"{', cross-judge search' if workload['cross_judge'] else ''}\n")
+    header = f"{'operation':<32}{'calls':>7}{'ok':>7}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'queries':>9}{'days':>8}{'lead d':>8}{'slots ms':>10}{'consec ms':>11}"
+    print(header)
+    print("-" * len(header))
+    rows = [("schedule_case", report["schedule_case"])]
+    rows += [(f"  {name}", stats) for name, stats in report["schedule_case_by_complexity"].items()]
+    rows.append(("schedule_next_hearing", report["schedule_next_hearing"]))
+    for name, s in rows:
+        print(f"{name:<32}{s['calls']:>7}{s['succeeded']:>7}{s['throughput_per_s']:>10}{s['p50_ms']:>10}"
+              f"{s['p99_ms']:>10}{s['max_ms']:>10}{s['queries_per_call']:>9}{s['days_scanned_per_call']:>8}"
+              f"{s['lead_days']:>8}{s['slot_generation_ms']:>10}{s['consecutive_check_ms']:>11}")
+
+if __name__ == "__main__":
+    result = run()
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
@@ -0,0 +1,73 @@
+"""
+Script to register many users or judges from a CSV or JSON file
+Passwords are hashed in parallel on every core
+
+Usage:
+    cd Back-End
+    venv\Scripts\activate
+    python bulk_register.py users accounts.csv
+    python bulk_register.py judges judges.json
+
+CSV files need a username,email,password header; JSON files hold an array of
+{"username": ..., "email": ..., "password": ...} objects.
+"""
+
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from fastapi import HTTPException
+    from app.database import SessionLocal
+    from app.models import User, Judge
+    from app.schemas import UserCreate, JudgeCreate
+    from app.onboarding import parse_accounts, register_accounts
+except ImportError as e:
+    print(f"❌ Error importing modules: {e}")
+    print("\nMake sure you:")
+    print("1. Activate virtual environment: venv\\Scripts\\activate")
+    print("2. Install requirements: pip install -r requirements.txt")
+    sys.exit(1)
+
+ACCOUNT_TYPES = {
+    "users": (User, UserCreate),
+    "judges": (Judge, JudgeCreate),
+}
+
+def bulk_register(account_type: str, path: str):
+    model, schema = ACCOUNT_TYPES[account_type]
+    with open(path, "rb") as f:
+        body = f.read()
+    content_type = "text/csv" if path.lower().endswith(".csv") else "application/json"
+
+    try:
+        entries = parse_accounts(body, content_type, schema)
+    except HTTPException as e:
+        print(f"❌ {e.detail}")
+        sys.exit(1)
+
+    db = SessionLocal()
+    try:
+        print(f"🔧 Registering {len(entries)} {account_type} from {path}...\n")
+        start = time.perf_counter()
+        result = register_accounts(db, model, entries)
+        elapsed = time.perf_counter() - start
+
+        for row in result.results:
+            if row.status == "error":
+                print(f"   ❌ Row {row.index + 1} ({row.email or '-'}): {row.error}")
+
+        print("\n" + "="*60)
+        print(f"✅ Created {result.created} of {result.total} {account_type} in {elapsed:.1f}s ({result.failed} failed)")
+        print("="*60)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] not in ACCOUNT_TYPES:
+        print(__doc__)
+        sys.exit(1)
+    bulk_register(sys.argv[1], sys.argv[2])
@@ -158,6 +158,18 @@ CREATE TABLE IF NOT EXISTS judge_schedules (
     FOREIGN KEY (case_id) REFERENCES cases(id) ON DELETE SET NULL
 ) COMMENT = 'Manages judge availability and P-MLQ case assignments';
 
+-- Scheduling claims: which worker process is scheduling a PENDING case
+-- (one row per queued case; removed after the scheduling attempt)
+CREATE TABLE IF NOT EXISTS scheduling_claims (
+    case_id INT PRIMARY KEY,
+    owner VARCHAR(100) NOT NULL,
+    claimed_at DATETIME NOT NULL,
+    
+    INDEX idx_scheduling_claims_owner (owner),
+    
+    FOREIGN KEY (case_id) REFERENCES cases(id) ON DELETE CASCADE
+) COMMENT = 'Background scheduler claims on pending cases';
+
 -- ============================================================================
 -- SAMPLE DATA
 -- ============================================================================
@@ -228,7 +240,7 @@ GROUP BY j.id, j.username, j.email;
 SELECT 'Tables Created' as Status, COUNT(*) as Count 
 FROM information_schema.tables 
 WHERE table_schema = 'case_management' 
-AND table_name IN ('users', 'judges', 'admins', 'cases', 'hearings', 'judge_schedules');
+AND table_name IN ('users', 'judges', 'admins', 'cases', 'hearings', 'judge_schedules', 'scheduling_claims');
 
 -- Check sample data
 SELECT 'Users' as Type, COUNT(*) as Count FROM users
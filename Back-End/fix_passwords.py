@@ -17,7 +17,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 try:
     from app.database import SessionLocal
     from app.models import User, Judge, Admin
-    from app.auth import get_password_hash
+    from app.onboarding import hash_passwords
 except ImportError as e:
     print(f"❌ Error importing modules: {e}")
     print("\nMake sure you:")
@@ -39,17 +39,19 @@ def fix_passwords():
             ('bully', 'bully@example.com', 'bully@2004')
         ]
         
-        for username, email, password in users:
+        # Hash each group's passwords in parallel
+        user_hashes = hash_passwords([password for _, _, password in users])
+        for (username, email, password), hashed_password in zip(users, user_hashes):
             user = db.query(User).filter(User.email == email).first()
             if user:
-                user.password = get_password_hash(password)
+                user.password = hashed_password
                 print(f"   ✅ Updated {username} ({email})")
             else:
                 # Create if doesn't exist
                 new_user = User(
                     username=username,
                     email=email,
-                    password=get_password_hash(password)
+                    password=hashed_password
                 )
                 db.add(new_user)
                 print(f"   ✅ Created {username} ({email})")
@@ -62,17 +64,18 @@ def fix_passwords():
             ('venki', 'venki@example.com', 'venki@2004')
         ]
         
-        for username, email, password in judges:
+        judge_hashes = hash_passwords([password for _, _, password in judges])
+        for (username, email, password), hashed_password in zip(judges, judge_hashes):
             judge = db.query(Judge).filter(Judge.email == email).first()
             if judge:
-                judge.password = get_password_hash(password)
+                judge.password = hashed_password
                 print(f"   ✅ Updated {username} ({email})")
             else:
                 # Create if doesn't exist
                 new_judge = Judge(
                     username=username,
                     email=email,
-                    password=get_password_hash(password)
+                    password=hashed_password
                 )
                 db.add(new_judge)
                 print(f"   ✅ Created {username} ({email})")
@@ -85,16 +88,17 @@ def fix_passwords():
             ('vimal@example.com', 'vimal@2004')
         ]
         
-        for email, password in admins:
+        admin_hashes = hash_passwords([password for _, password in admins])
+        for (email, password), hashed_password in zip(admins, admin_hashes):
             admin = db.query(Admin).filter(Admin.email == email).first()
             if admin:
-                admin.password = get_password_hash(password)
+                admin.password = hashed_password
                 print(f"   ✅ Updated {email.split('@')[0]} ({email})")
             else:
                 # Create if doesn't exist
                 new_admin = Admin(
                     email=email,
-                    password=get_password_hash(password)
+                    password=hashed_password
                 )
                 db.add(new_admin)
                 print(f"   ✅ Created {email.split('@')[0]} ({email})")
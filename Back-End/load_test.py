@@ -0,0 +1,239 @@
+"""
+HTTP load test for filing and dashboard traffic
+
+Replays a realistic traffic mix with an asyncio HTTP client (httpx) and reports
+throughput, latency percentiles and error rates per endpoint:
+- a login burst (everyone signing in at 9 AM) against /api/auth/login/*
+- steady traffic mixing logins, multipart filings against /api/cases/file and
+  dashboard polling of analytics and case lists
+
+By default the app runs in-process on a scratch SQLite database (no server
+needed); pass --url to load-test a running server instead. Test accounts are
+created through the bulk registration endpoints with a per-run prefix.
+
+Usage:
+    cd Back-End
+    python load_test.py
+    python load_test.py --duration 60 --concurrency 100 --mix login=10,file=20,dashboard=70
+    python load_test.py --url http://localhost:8000 --login-burst 500
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+from bench_stats import percentile
+
+PASSWORD = "loadtest-password"
+DEFAULT_MIX = "login=15,file=15,dashboard=70"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load-test the case management API")
+    parser.add_argument("--url", help="Base URL of a running server (default: run the app in-process)")
+    parser.add_argument("--db", default="sqlite:///./load_test.db",
+                        help="Scratch database for in-process runs (recreated on every run)")
+    parser.add_argument("--users", type=int, default=50, help="Filing users to register")
+    parser.add_argument("--judges", type=int, default=10, help="Judges to register")
+    parser.add_argument("--login-burst", type=int, default=200, help="Concurrent logins fired at the start (0 to skip)")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of steady traffic")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent virtual clients")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Traffic mix as scenario=weight pairs (login, file, dashboard)")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args()
+
+class Recorder:
+    """Latency and status samples per endpoint label"""
+
+    def __init__(self):
+        self.samples = {}
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add(self, label: str, seconds: float, ok: bool):
+        self.samples.setdefault(label, []).append((seconds, ok))
+
+    def stop(self):
+        self.elapsed = time.perf_counter() - self.started
+
+    def report(self) -> dict:
+        return {label: summarize(samples, self.elapsed) for label, samples in sorted(self.samples.items())}
+
+def summarize(samples, elapsed: float) -> dict:
+    latencies = [seconds for seconds, _ in samples]
+    errors = sum(1 for _, ok in samples if not ok)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "rps": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(max(latencies, default=0) * 1000, 1),
+    }
+
+async def timed(client: httpx.AsyncClient, recorder: Recorder, label: str, method: str, url: str, **kwargs):
+    """Send one request and record it under `label` (route template, not the concrete URL)"""
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+        ok = response.status_code < 400
+    except httpx.HTTPError:
+        response, ok = None, False
+    recorder.add(label, time.perf_counter() - start, ok)
+    return response
+
+class Scenarios:
+    """The requests a virtual client can make, against the accounts created by setup()"""
+
+    def __init__(self, client: httpx.AsyncClient, rng: random.Random, prefix: str):
+        self.client = client
+        self.rng = rng
+        self.prefix = prefix
+        self.user_ids = []
+        self.judge_ids = []
+
+    def _accounts(self, kind: str, count: int):
+        return [{"username": f"{self.prefix}{kind}{i}", "email": f"{self.prefix}{kind}{i}@loadtest.example.com",
+                 "password": PASSWORD} for i in range(count)]
+
+    async def setup(self, users: int, judges: int):
+        for path, kind, count, ids in (("/api/users/register/bulk", "user", users, self.user_ids),
+                                       ("/api/judges/register/bulk", "judge", judges, self.judge_ids)):
+            response = await self.client.post(path, json=self._accounts(kind, count))
+            response.raise_for_status()
+            ids.extend(row["id"] for row in response.json()["results"] if row["status"] == "created")
+        if not self.user_ids or not self.judge_ids:
+            raise SystemExit("Could not register load-test accounts")
+
+    async def login(self, recorder: Recorder):
+        role, ids = self.rng.choice((("user", self.user_ids), ("judge", self.judge_ids)))
+        index = self.rng.randrange(len(ids))
+        await timed(self.client, recorder, f"POST /api/auth/login/{role}", "POST", f"/api/auth/login/{role}",
+                    json={"email": f"{self.prefix}{role}{index}@loadtest.example.com", "password": PASSWORD})
+
+    async def file(self, recorder: Recorder):
+        sections = ",".join(f"S{n}" for n in range(self.rng.randint(1, 7)))
+        data = {"title": "Load test case", "description": "Filed by load_test.py",
+                "sections": sections, "user_id": str(self.rng.choice(self.user_ids))}
+        files = None
+        if self.rng.random() < 0.3:
+            files = {"document": ("petition.pdf", os.urandom(self.rng.randint(10, 200) * 1024), "application/pdf")}
+        await timed(self.client, recorder, "POST /api/cases/file", "POST", "/api/cases/file", data=data, files=files)
+
+    async def dashboard(self, recorder: Recorder):
+        judge_id = self.rng.choice(self.judge_ids)
+        user_id = self.rng.choice(self.user_ids)
+        label, url = self.rng.choice((
+            ("GET /api/admins/analytics", "/api/admins/analytics"),
+            ("GET /api/judges/analytics", "/api/judges/analytics"),
+            ("GET /api/judges/{id}/analytics", f"/api/judges/{judge_id}/analytics"),
+            ("GET /api/cases/judge/{id}", f"/api/cases/judge/{judge_id}?view=summary&limit=50"),
+            ("GET /api/cases/user/{id}", f"/api/cases/user/{user_id}?view=summary&limit=50"),
+        ))
+        await timed(self.client, recorder, label, "GET", url)
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ("login", "file", "dashboard"):
+            raise SystemExit(f"Unknown scenario in --mix: {name}")
+        weights[name.strip()] = float(weight)
+    return weights
+
+async def login_burst(scenarios: Scenarios, count: int) -> Recorder:
+    recorder = Recorder()
+    await asyncio.gather(*[scenarios.login(recorder) for _ in range(count)])
+    recorder.stop()
+    return recorder
+
+async def steady_traffic(scenarios: Scenarios, args) -> Recorder:
+    weights = parse_mix(args.mix)
+    names = list(weights)
+    recorder = Recorder()
+    deadline = time.perf_counter() + args.duration
+
+    async def client_loop():
+        while time.perf_counter() < deadline:
+            name = scenarios.rng.choices(names, [weights[n] for n in names])[0]
+            await getattr(scenarios, name)(recorder)
+
+    await asyncio.gather(*[client_loop() for _ in range(args.concurrency)])
+    recorder.stop()
+    return recorder
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    prefix = f"lt{uuid.uuid4().hex[:6]}_"
+    limits = httpx.Limits(max_connections=args.concurrency + args.login_burst)
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits)
+        lifespan = None
+    else:
+        from main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest",
+                                   timeout=args.timeout, limits=limits)
+        # ASGITransport does not run startup/shutdown, so enter the app's lifespan here
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+
+    try:
+        async with client:
+            scenarios = Scenarios(client, rng, prefix)
+            await scenarios.setup(args.users, args.judges)
+            phases = {}
+            if args.login_burst:
+                phases["login_burst"] = await login_burst(scenarios, args.login_burst)
+            phases["steady"] = await steady_traffic(scenarios, args)
+    finally:
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+
+    return {
+        "target": args.url or "in-process",
+        "concurrency": args.concurrency,
+        "phases": {name: {"seconds": round(rec.elapsed, 2), "endpoints": rec.report()} for name, rec in phases.items()},
+    }
+
+def print_report(report: dict):
+    print(f"Load test against {report['target']} ({report['concurrency']} concurrent clients)")
+    for name, phase in report["phases"].items():
+        print(f"\n{name} ({phase['seconds']}s)")
+        header = f"{'endpoint':<36}{'requests':>9}{'errors':>8}{'err %':>7}{'rps':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+        print(header)
+        print("-" * len(header))
+        for label, s in phase["endpoints"].items():
+            print(f"{label:<36}{s['requests']:>9}{s['errors']:>8}{s['error_rate'] * 100:>7.1f}{s['rps']:>8}"
+                  f"{s['p50_ms']:>9}{s['p95_ms']:>9}{s['p99_ms']:>9}{s['max_ms']:>9}")
+
+def prepare_in_process_database(url: str):
+    """Point the in-process app at a fresh scratch database (settings are read at import time)"""
+    os.environ["DATABASE_URL"] = url
+    os.environ.setdefault("SECRET_KEY", "load-test")
+    if url.startswith("sqlite:///"):
+        path = url[len("sqlite:///"):]
+        if path != ":memory:" and os.path.exists(path):
+            os.remove(path)
+
+if __name__ == "__main__":
+    args = parse_args()
+    if not args.url:
+        prepare_in_process_database(args.db)
+    result = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
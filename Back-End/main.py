@@ -1,10 +1,29 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine
+from app.config import settings
+from app.database import engine, async_engine
 from app.models import Base
 from app.routers import users, judges, admins, auth, cases
+from app.scheduling_queue import scheduling_queue
+from app.middleware import RequestTimingMiddleware, UploadSizeLimitMiddleware
+from app.metrics import registry
 
-app = FastAPI(title="Differential Case Flow Management System")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background worker that schedules filed cases
+    if settings.BACKGROUND_SCHEDULING:
+        scheduling_queue.start()
+        scheduling_queue.enqueue_pending()
+    yield
+    scheduling_queue.stop()
+    await async_engine.dispose()
+
+app = FastAPI(title="Differential Case Flow Management System", lifespan=lifespan)
+
+# Reject oversized uploads while they are received (innermost, so 413s still get CORS headers)
+app.add_middleware(UploadSizeLimitMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -12,8 +31,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Keyset pagination cursor for list endpoints
 )
 
+# Server-Timing header and slow request log (outermost, so it times everything else)
+app.add_middleware(RequestTimingMiddleware)
+
 Base.metadata.create_all(bind=engine)
 
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
@@ -28,3 +51,8 @@ def root():
         "message": "Differential Case Flow Management System",
         "description": "Multi-level queue scheduling for case management"
     }
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Prometheus text-format metrics for this worker process"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
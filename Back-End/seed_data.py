@@ -4,7 +4,7 @@ Run this after setting up the database
 """
 from app.database import SessionLocal
 from app.models import User, Judge, Admin
-from app.auth import get_password_hash
+from app.onboarding import hash_passwords
 
 def seed_database():
     db = SessionLocal()
@@ -22,11 +22,13 @@ def seed_database():
             {"username": "bully", "email": "bully@example.com", "password": "bully@2004"}
         ]
         
-        for user_data in users_data:
+        # Hash each group's passwords in parallel
+        user_hashes = hash_passwords([user_data["password"] for user_data in users_data])
+        for user_data, hashed_password in zip(users_data, user_hashes):
             user = User(
                 username=user_data["username"],
                 email=user_data["email"],
-                password=get_password_hash(user_data["password"])
+                password=hashed_password
             )
             db.add(user)
         
@@ -37,11 +39,12 @@ def seed_database():
             {"username": "venki", "email": "venki@example.com", "password": "venki@2004"}
         ]
         
-        for judge_data in judges_data:
+        judge_hashes = hash_passwords([judge_data["password"] for judge_data in judges_data])
+        for judge_data, hashed_password in zip(judges_data, judge_hashes):
             judge = Judge(
                 username=judge_data["username"],
                 email=judge_data["email"],
-                password=get_password_hash(judge_data["password"])
+                password=hashed_password
             )
             db.add(judge)
         
@@ -52,10 +55,11 @@ def seed_database():
             {"email": "vimal@example.com", "password": "vimal@2004"}
         ]
         
-        for admin_data in admins_data:
+        admin_hashes = hash_passwords([admin_data["password"] for admin_data in admins_data])
+        for admin_data, hashed_password in zip(admins_data, admin_hashes):
             admin = Admin(
                 email=admin_data["email"],
-                password=get_password_hash(admin_data["password"])
+                password=hashed_password
             )
             db.add(admin)
         
@@ -0,0 +1,23 @@
+"""Nearest-rank percentile used by the benchmark reports"""
+import pytest
+from bench_stats import percentile
+
+
+@pytest.mark.parametrize("values, pct, expected", [
+    (range(1, 11), 50, 5),
+    (range(1, 11), 90, 9),
+    (range(1, 11), 100, 10),
+    (range(1, 101), 95, 95),
+    (range(1, 101), 99, 99),
+    (range(1, 101), 99.5, 100),
+    (range(1, 5), 25, 1),
+    (range(1, 5), 0, 1),
+    ([3.5], 99, 3.5),
+    ([], 50, 0.0),
+])
+def test_percentile_known_answers(values, pct, expected):
+    assert percentile(list(values), pct) == expected
+
+
+def test_percentile_ignores_input_order():
+    assert percentile([10, 1, 7, 3, 5], 50) == 5
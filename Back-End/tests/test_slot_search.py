@@ -0,0 +1,156 @@
+"""
+Slot search equivalence checks
+
+The bitmap search (first_free_run, find_next_available_slot) must find the same
+slot as the original pairwise walk over 30-minute slots, and the cross-judge
+OccupancyMatrix must pick the same (date, time, judge) as taking the minimum of
+every judge's own earliest slot. Bookings are random, on a 15-minute grid so
+that some of them cover only part of a slot.
+"""
+import os
+import random
+from datetime import date, datetime, time, timedelta
+
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.setdefault("SECRET_KEY", "test")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, Judge, JudgeSchedule, CaseComplexity
+from app.occupancy import first_free_run
+from app.occupancy_matrix import OccupancyMatrix, numpy_available
+from app.scheduler import MultiLevelQueueScheduler, occupancy_index
+
+Scheduler = MultiLevelQueueScheduler
+START = date(2030, 1, 7)  # a Monday
+DURATIONS = (30, 60, 90, 120, 150, 180)
+
+
+def seed_bookings(db, rng: random.Random, judges: int, bookings: int, days: int):
+    for judge_id in range(1, judges + 1):
+        db.add(Judge(id=judge_id, username=f"judge{judge_id}", email=f"judge{judge_id}@example.com", password="x"))
+    rows = []
+    for _ in range(bookings):
+        start = rng.choice(range(Scheduler.WORK_START_HOUR * 60, Scheduler.WORK_END_HOUR * 60, 15))
+        end = min(start + rng.choice((15, 30, 60, 90, 120)), Scheduler.WORK_END_HOUR * 60)
+        rows.append(JudgeSchedule(
+            judge_id=rng.randint(1, judges),
+            date=START + timedelta(days=rng.randint(0, days)),
+            start_time=time(start // 60, start % 60),
+            end_time=time(end // 60, end % 60),
+            is_available=False
+        ))
+    db.add_all(rows)
+    db.commit()
+    return [(row.judge_id, row.date, row.start_time, row.end_time) for row in rows]
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    occupancy_index.invalidate()
+    yield session
+    session.close()
+    occupancy_index.invalidate()
+
+
+# Reference implementation: the pairwise walk the bitmap search replaced
+
+def baseline_free_slots(bookings, judge_id: int, day: date, queue_level: int):
+    slots = []
+    current = datetime.combine(day, time(Scheduler.WORK_START_HOUR, 0))
+    day_end = datetime.combine(day, time(Scheduler.WORK_END_HOUR, 0))
+    existing = [(start, end) for j, d, start, end in bookings if j == judge_id and d == day]
+    while current < day_end:
+        slot_end = current + timedelta(minutes=Scheduler.SLOT_DURATION)
+        in_block = any(block_start <= current.time() < block_end
+                       for block_start, block_end in Scheduler.Q1_TIME_BLOCKS)
+        overlaps = any(not (slot_end <= datetime.combine(day, start) or current >= datetime.combine(day, end))
+                       for start, end in existing)
+        if not Scheduler.is_break_time(current.time()) and (queue_level != 1 or in_block) and not overlaps:
+            slots.append((current.time(), slot_end.time()))
+        current = slot_end
+    return slots
+
+
+def baseline_find_slot(bookings, judge_id: int, duration: int, queue_level: int, start_date: date):
+    required = (duration + Scheduler.SLOT_DURATION - 1) // Scheduler.SLOT_DURATION
+    for offset in range(Scheduler.SEARCH_HORIZON_DAYS):
+        day = start_date + timedelta(days=offset)
+        if day.weekday() >= 5:
+            continue
+        slots = baseline_free_slots(bookings, judge_id, day, queue_level)
+        for i in range(len(slots) - required + 1):
+            if all(slots[i + k][1] == slots[i + k + 1][0] for k in range(required - 1)):
+                return day, slots[i][0]
+    return None
+
+
+def test_first_free_run_matches_linear_scan():
+    rng = random.Random(7)
+    for _ in range(5000):
+        free = rng.getrandbits(16)
+        length = rng.randint(1, 16)
+        expected = next((i for i in range(16 - length + 1)
+                         if all(free >> (i + k) & 1 for k in range(length))), None)
+        assert first_free_run(free, length) == expected, (bin(free), length)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_slot_search_matches_baseline(db, seed):
+    rng = random.Random(seed)
+    bookings = seed_bookings(db, rng, judges=3, bookings=600, days=60)
+    scheduler = Scheduler(db)
+    for judge_id in (1, 2, 3):
+        for offset in range(0, 40, 3):
+            start_date = START + timedelta(days=offset)
+            for queue_level in (1, 2, 3):
+                assert scheduler.get_available_time_slots(judge_id, start_date, queue_level) == \
+                    baseline_free_slots(bookings, judge_id, start_date, queue_level)
+            for complexity in CaseComplexity:
+                queue_level = scheduler.get_queue_level(complexity)
+                for duration in DURATIONS:
+                    assert scheduler.find_next_available_slot(judge_id, duration, complexity, start_date) == \
+                        baseline_find_slot(bookings, judge_id, duration, queue_level, start_date), \
+                        (judge_id, complexity, start_date, duration)
+
+
+@pytest.mark.skipif(not numpy_available(), reason="OccupancyMatrix needs numpy")
+@pytest.mark.parametrize("seed", [1, 2])
+def test_earliest_slot_matches_per_judge_minimum(db, seed):
+    rng = random.Random(seed)
+    judges = 8
+    seed_bookings(db, rng, judges=judges, bookings=3000, days=30)
+    scheduler = Scheduler(db)
+    matrix = OccupancyMatrix(occupancy_index, Scheduler.SEARCH_HORIZON_DAYS)
+    for _ in range(30):
+        workload = {judge_id: rng.randint(0, 3) for judge_id in range(1, judges + 1)}
+        for complexity in CaseComplexity:
+            duration = Scheduler.DURATION_MAP[complexity]
+            required = (duration + Scheduler.SLOT_DURATION - 1) // Scheduler.SLOT_DURATION
+            allowed = scheduler.queue_slot_mask(scheduler.get_queue_level(complexity))
+            found, _ = matrix.earliest_slot(db, list(workload), allowed, required, START, workload)
+
+            # Brute force: every judge's own earliest slot, ties to the lowest workload, then id
+            candidates = []
+            for judge_id in workload:
+                slot = scheduler.find_next_available_slot(judge_id, duration, complexity, START)
+                if slot:
+                    candidates.append((slot[0], slot[1], workload[judge_id], judge_id))
+            expected = min(candidates) if candidates else None
+
+            got = None
+            if found:
+                judge_id, slot_date, first_slot = found
+                got = (slot_date, occupancy_index.slot_time(first_slot), workload[judge_id], judge_id)
+            assert got == expected, complexity
+
+        # Book one more slot in memory so the next round rebuilds a changed matrix row
+        judge_id = rng.randint(1, judges)
+        day = START + timedelta(days=rng.randint(0, 20))
+        start = rng.choice(range(9 * 60, 16 * 60, 30))
+        occupancy_index.reserve(judge_id, day, time(start // 60, start % 60),
+                                time((start + 30) // 60, (start + 30) % 60))
@@ -29,7 +29,7 @@ export function AdminAnalyticsPage() {
 
     const fetchCases = async () => {
         try {
-            const response = await fetch('http://localhost:8000/api/cases/')
+            const response = await fetch('http://localhost:8000/api/cases/?view=summary')
             if (response.ok) {
                 const data = await response.json()
                 setCases(data)
@@ -2,6 +2,9 @@ import { useState, useEffect } from 'react'
 import { SharedNavbar } from '../components/SharedNavbar'
 import './AdminManageRecordsPage.css'
 
+// Rows fetched per request; more are loaded on demand with the X-Next-Cursor header
+const PAGE_SIZE = 100
+
 export function AdminManageRecordsPage() {
     const [username, setUsername] = useState('')
     const [activeTab, setActiveTab] = useState('cases')
@@ -9,6 +12,7 @@ export function AdminManageRecordsPage() {
     const [users, setUsers] = useState([])
     const [judges, setJudges] = useState([])
     const [loading, setLoading] = useState(true)
+    const [nextCursors, setNextCursors] = useState({})
     
     // Edit modal states
     const [showEditModal, setShowEditModal] = useState(false)
@@ -37,37 +41,37 @@ export function AdminManageRecordsPage() {
         }
     }
 
-    const fetchCases = async () => {
+    // Fetch the first page of a list (replacing it), or the page after `cursor` (appended)
+    const fetchPage = async (list, setRows, cursor) => {
+        const params = new URLSearchParams({ limit: PAGE_SIZE })
+        if (cursor) params.set('cursor', cursor)
+        const response = await fetch(`http://localhost:8000/api/admins/${list}?${params}`)
+        if (response.ok) {
+            const data = await response.json()
+            setRows(previous => cursor ? [...previous, ...data] : data)
+            setNextCursors(previous => ({ ...previous, [list]: response.headers.get('X-Next-Cursor') }))
+        }
+    }
+
+    const fetchCases = async (cursor) => {
         try {
-            const response = await fetch('http://localhost:8000/api/admins/cases')
-            if (response.ok) {
-                const data = await response.json()
-                setCases(data)
-            }
+            await fetchPage('cases', setCases, cursor)
         } catch (error) {
             console.error('Error fetching cases:', error)
         }
     }
 
-    const fetchUsers = async () => {
+    const fetchUsers = async (cursor) => {
         try {
-            const response = await fetch('http://localhost:8000/api/admins/users')
-            if (response.ok) {
-                const data = await response.json()
-                setUsers(data)
-            }
+            await fetchPage('users', setUsers, cursor)
         } catch (error) {
             console.error('Error fetching users:', error)
         }
     }
 
-    const fetchJudges = async () => {
+    const fetchJudges = async (cursor) => {
         try {
-            const response = await fetch('http://localhost:8000/api/admins/judges')
-            if (response.ok) {
-                const data = await response.json()
-                setJudges(data)
-            }
+            await fetchPage('judges', setJudges, cursor)
         } catch (error) {
             console.error('Error fetching judges:', error)
         }
@@ -243,19 +247,19 @@ export function AdminManageRecordsPage() {
                         className={`tab ${activeTab === 'cases' ? 'active' : ''}`}
                         onClick={() => setActiveTab('cases')}
                     >
-                        Cases ({cases.length})
+                        Cases ({cases.length}{nextCursors.cases ? '+' : ''})
                     </button>
                     <button 
                         className={`tab ${activeTab === 'users' ? 'active' : ''}`}
                         onClick={() => setActiveTab('users')}
                     >
-                        Users ({users.length})
+                        Users ({users.length}{nextCursors.users ? '+' : ''})
                     </button>
                     <button 
                         className={`tab ${activeTab === 'judges' ? 'active' : ''}`}
                         onClick={() => setActiveTab('judges')}
                     >
-                        Judges ({judges.length})
+                        Judges ({judges.length}{nextCursors.judges ? '+' : ''})
                     </button>
                 </div>
 
@@ -308,6 +312,11 @@ export function AdminManageRecordsPage() {
                                     ))}
                                 </tbody>
                             </table>
+                            {nextCursors.cases && (
+                                <button className="load-more-btn" onClick={() => fetchCases(nextCursors.cases)}>
+                                    Load more
+                                </button>
+                            )}
                         </div>
                     )}
 
@@ -351,6 +360,11 @@ export function AdminManageRecordsPage() {
                                     ))}
                                 </tbody>
                             </table>
+                            {nextCursors.users && (
+                                <button className="load-more-btn" onClick={() => fetchUsers(nextCursors.users)}>
+                                    Load more
+                                </button>
+                            )}
                         </div>
                     )}
 
@@ -394,6 +408,11 @@ export function AdminManageRecordsPage() {
                                     ))}
                                 </tbody>
                             </table>
+                            {nextCursors.judges && (
+                                <button className="load-more-btn" onClick={() => fetchJudges(nextCursors.judges)}>
+                                    Load more
+                                </button>
+                            )}
                         </div>
                     )}
                 </div>
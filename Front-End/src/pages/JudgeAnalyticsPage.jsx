@@ -34,7 +34,7 @@ export function JudgeAnalyticsPage() {
 
     const fetchCases = async (jid) => {
         try {
-            const response = await fetch(`http://localhost:8000/api/cases/judge/${jid}`)
+            const response = await fetch(`http://localhost:8000/api/cases/judge/${jid}?view=summary`)
             if (response.ok) {
                 const data = await response.json()
                 setCases(data)
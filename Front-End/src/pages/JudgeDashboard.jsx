@@ -34,10 +34,10 @@ export function JudgeDashboard() {
 
     const fetchRecentCases = async (jid) => {
         try {
-            const response = await fetch(`http://localhost:8000/api/cases/judge/${jid}`)
+            const response = await fetch(`http://localhost:8000/api/cases/judge/${jid}?view=summary&limit=5`)
             if (response.ok) {
                 const data = await response.json()
-                setRecentCases(data.slice(0, 5))
+                setRecentCases(data)
             }
         } catch (error) {
             console.error('Error fetching cases:', error)
@@ -20,10 +20,10 @@ export function UserDashboard() {
 
     const fetchRecentCases = async (uid) => {
         try {
-            const response = await fetch(`http://localhost:8000/api/cases/user/${uid}`)
+            const response = await fetch(`http://localhost:8000/api/cases/user/${uid}?view=summary&limit=3`)
             if (response.ok) {
                 const data = await response.json()
-                setRecentCases(data.slice(0, 3)) // Show only 3 recent cases
+                setRecentCases(data) // Only the 3 most recent cases are requested
             }
         } catch (error) {
             console.error('Error fetching cases:', error)
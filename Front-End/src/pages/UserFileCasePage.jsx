@@ -55,7 +55,11 @@ export function UserFileCasePage() {
 
             if (response.ok) {
                 const result = await response.json()
-                alert(`Case filed successfully!\nCase Number: ${result.case_number}\nScheduled Date: ${result.scheduled_date}\nScheduled Time: ${result.scheduled_time}`)
+                if (result.scheduled_date) {
+                    alert(`Case filed successfully!\nCase Number: ${result.case_number}\nScheduled Date: ${result.scheduled_date}\nScheduled Time: ${result.scheduled_time}`)
+                } else {
+                    alert(`Case filed successfully!\nCase Number: ${result.case_number}\nYour hearing is being scheduled - check the case status page for the date and time.`)
+                }
                 navigate('/user-check-status')
             } else {
                 const error = await response.json()